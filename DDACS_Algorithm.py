@@ -7,6 +7,14 @@ Author: Phạm Lê Ngọc Sơn
 
 import numpy as np
 import random
+import heapq
+import copy
+import json
+import marshal
+from bisect import insort, bisect_right
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 
 # Hàm tính E_j và L_j
 def calculate_E_L(predecessors, successors, p, N):
@@ -33,9 +41,347 @@ def calculate_E_L(predecessors, successors, p, N):
 def nth_root(x, n):
     return round(x ** (1 / n))
 
+def critical_path_length(predecessors, p, N):
+    """Độ dài đường găng, tính theo thứ tự tô-pô nên không phụ thuộc cách đánh số hoạt động"""
+    successors = [[] for _ in range(N + 2)]
+    indegree = [len(predecessors[j]) for j in range(N + 2)]
+    for j in range(N + 2):
+        for i in predecessors[j]:
+            successors[i].append(j)
+
+    start = [0] * (N + 2)
+    queue = [j for j in range(N + 2) if indegree[j] == 0]
+    while queue:
+        i = queue.pop()
+        for j in successors[i]:
+            start[j] = max(start[j], start[i] + p[i])
+            indegree[j] -= 1
+            if indegree[j] == 0:
+                queue.append(j)
+    return max(start[j] + p[j] for j in range(N + 2))
+
+def compute_lower_bound(predecessors, p, R, r, N):
+    """Cận dưới của makespan: max(độ dài đường găng, cận tài nguyên ceil(sum p_j * r_jk / R_k))"""
+    critical_path = critical_path_length(predecessors, p, N)
+    resource_bound = 0
+    for k in range(len(R)):
+        work = sum(p[j] * r[j][k] for j in range(N + 2))
+        if R[k] > 0:
+            resource_bound = max(resource_bound, -(-work // R[k]))
+    return max(critical_path, resource_bound)
+
+def _run_colony(colony, iterations, time_budget=None):
+    """
+    Chạy một đàn kiến thêm iterations vòng lặp, ghi lại (thời gian, makespan tốt nhất) sau mỗi vòng.
+    time_budget: số giây còn lại, đàn dừng giữa chặng (kể cả giữa một vòng lặp) khi hết thời gian.
+    """
+    curve = []
+    start = time.perf_counter()
+    max_iter, colony.max_iter = colony.max_iter, colony.iteration + iterations
+    try:
+        colony.run(callback=lambda stats: curve.append((time.perf_counter() - start, colony.best_makespan)),
+                   time_budget=time_budget, stop_at_lower_bound=False, resume=True, entropy=False)
+    finally:
+        colony.max_iter = max_iter
+    return colony, curve
+
+def _build_ants(solver, seeds):
+    """
+    Xây dựng lời giải cho các kiến trên bản sao pheromone, mỗi kiến một seed (chạy trong tiến trình con).
+    Trả về các cặp (lời giải, thời gian xây dựng) và số liệu profile của các kiến này (None nếu không bật).
+    """
+    if solver.eta_beta is None:  # Bản sao gọn (worker_copy): tính lại eta^beta từ E, L hiện tại
+        solver.eta_beta = solver.eta_columns(range(solver.N + 2))
+    profiler, solver.profiler = solver.profiler, None if solver.profiler is None else Profiler()
+    try:
+        built = [solver.timed_build(rng=random.Random(seed), tau=solver.tau.copy()) for seed in seeds]
+        return built, solver.profiler
+    finally:
+        solver.profiler = profiler
+
+# Ma trận pheromone với bay hơi lười
+class LazyPheromone:
+    """
+    Ma trận pheromone lưu dưới dạng data * scale. Bay hơi toàn cục chỉ nhân scale,
+    nên mỗi vòng lặp chỉ ghi vào các ô được cập nhật. Hỗ trợ các phép toán mà DDACS dùng
+    trên ndarray: đọc/ghi theo chỉ số, *=, +=, copy và np.asarray.
+    """
+    def __init__(self, shape, value, dtype=np.float64):
+        self.data = np.full(shape, value, dtype=dtype)
+        self.scale = 1.0
+        # Chuẩn hóa lại khi scale quá nhỏ để data không tràn số
+        self.min_scale = float(np.finfo(dtype).tiny) ** 0.5
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    def __getitem__(self, key):
+        return self.data[key] * self.scale
+
+    def __setitem__(self, key, value):
+        self.data[key] = np.asarray(value) / self.scale
+
+    def __imul__(self, factor):
+        self.scale *= factor
+        if self.scale < self.min_scale:
+            self.normalize()
+        return self
+
+    def __iadd__(self, other):
+        self.data += np.asarray(other) / self.scale
+        return self
+
+    def __array__(self, dtype=None, copy=None):
+        values = self.data * self.scale
+        return values if dtype is None else values.astype(dtype)
+
+    def normalize(self):
+        """Nhân scale vào data và đặt lại scale = 1"""
+        self.data *= self.scale
+        self.scale = 1.0
+
+    def copy(self):
+        other = LazyPheromone.__new__(LazyPheromone)
+        other.data = self.data.copy()
+        other.scale = self.scale
+        other.min_scale = self.min_scale
+        return other
+
+# Bài toán RCPSP dạng mảng, bất biến
+class Problem:
+    """
+    Dữ liệu bài toán dùng chung (chỉ đọc) cho mọi kiến, tiến trình và đàn kiến: thời gian thực hiện,
+    yêu cầu và giới hạn tài nguyên dạng mảng int, quan hệ phụ thuộc dạng CSR (pred_ptr/pred_idx,
+    succ_ptr/succ_idx), thứ tự tô-pô, E/L tĩnh (cùng công thức với calculate_E_L), tail/hops và cận dưới.
+    Các mảng bị khóa ghi; p, r, predecessors, successors là tuple để các vòng lặp Python đọc nhanh.
+    """
+    def __init__(self, N, p, R, r, predecessors=None, successors=None):
+        if predecessors is None:
+            if successors is None:
+                raise ValueError("Cần predecessors hoặc successors")
+            predecessors = [[] for _ in range(N + 2)]
+            for i in range(N + 2):
+                for j in successors[i]:
+                    predecessors[j].append(i)
+        K = len(R)
+        self.N = N
+        self.K = K
+        self.durations = np.array(p, dtype=np.int64).reshape(N + 2)
+        self.demand = np.array(r, dtype=np.int64).reshape(N + 2, K)
+        self.capacity = np.array(R, dtype=np.int64).reshape(K)
+
+        # CSR: hàng j của pred_* là các hoạt động trước của j (giữ thứ tự đầu vào),
+        # hàng i của succ_* là các hoạt động sau của i theo chỉ số tăng dần
+        counts = np.array([len(predecessors[j]) for j in range(N + 2)], dtype=np.int32)
+        self.pred_ptr = np.concatenate(([0], np.cumsum(counts))).astype(np.int32)
+        self.pred_idx = np.array([i for j in range(N + 2) for i in predecessors[j]], dtype=np.int32)
+        self.edge_to = np.repeat(np.arange(N + 2, dtype=np.int32), counts)
+        self.edge_from = self.pred_idx
+        by_source = np.argsort(self.edge_from, kind="stable")
+        self.succ_idx = self.edge_to[by_source]
+        self.succ_ptr = np.concatenate(([0], np.cumsum(np.bincount(self.edge_from, minlength=N + 2)))).astype(np.int32)
+
+        self.p = tuple(int(v) for v in self.durations)
+        self.R = tuple(int(v) for v in self.capacity)
+        self.r = tuple(tuple(int(v) for v in row) for row in self.demand)
+        self.predecessors = tuple(tuple(int(v) for v in self.pred_idx[self.pred_ptr[j]:self.pred_ptr[j + 1]])
+                                  for j in range(N + 2))
+        self.successors = tuple(tuple(int(v) for v in self.succ_idx[self.succ_ptr[i]:self.succ_ptr[i + 1]])
+                                for i in range(N + 2))
+
+        # Thứ tự tô-pô (Kahn, ưu tiên chỉ số nhỏ)
+        indegree = counts.tolist()
+        heap = [j for j in range(N + 2) if indegree[j] == 0]
+        order = []
+        while heap:
+            i = heapq.heappop(heap)
+            order.append(i)
+            for j in self.successors[i]:
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    heapq.heappush(heap, j)
+        if len(order) != N + 2:
+            raise ValueError("Quan hệ phụ thuộc có chu trình")
+        self.order = np.array(order, dtype=np.int32)
+
+        # E/L theo công thức của calculate_E_L, duyệt theo thứ tự tô-pô; es là thời điểm bắt đầu sớm nhất thật
+        E, L = [0] * (N + 2), [0] * (N + 2)
+        es, tail, hops = [0] * (N + 2), [0] * (N + 2), [0] * (N + 2)
+        for j in order:
+            before = self.predecessors[j]
+            es[j] = max((es[i] + self.p[i] for i in before), default=0)
+            if 1 <= j <= N:
+                E[j] = max((E[i] + self.p[i] for i in before), default=0)
+        for j in reversed(order):
+            after = self.successors[j]
+            if j <= N:
+                L[j] = min(L[i] - self.p[j] for i in after) if after else E[j] + self.p[j]
+            tail[j] = self.p[j] + max((tail[i] for i in after), default=0)
+            hops[j] = 1 + max(hops[i] for i in after) if after else 0
+        self.E = np.array(E, dtype=np.int64)
+        self.L = np.array(L, dtype=np.int64)
+        self.tail = np.array(tail, dtype=np.int64)
+        self.hops = np.array(hops, dtype=np.int64)
+
+        self.critical_path = max(es[j] + self.p[j] for j in range(N + 2))
+        work = (self.durations[:, None] * self.demand).sum(axis=0)
+        positive = self.capacity > 0
+        resource_bound = int(np.max(-(-work[positive] // self.capacity[positive]), initial=0))
+        self.lower_bound = max(self.critical_path, resource_bound)
+        self._freeze()
+
+    @classmethod
+    def from_instance(cls, instance):
+        """Tạo từ dict bài toán của DDACS_Instances"""
+        return cls(instance["N"], instance["p"], instance["R"], instance["r"],
+                   instance["predecessors"], instance["successors"])
+
+    def _freeze(self):
+        for value in self.__dict__.values():
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+        object.__setattr__(self, "_frozen", True)
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError("Problem là bất biến")
+        object.__setattr__(self, name, value)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._freeze()
+
+    @property
+    def nbytes(self):
+        """Bộ nhớ của các mảng"""
+        return sum(value.nbytes for value in self.__dict__.values() if isinstance(value, np.ndarray))
+
+# Bộ đếm và đồng hồ cho đường nóng của DDACS (profile=True)
+class Profiler:
+    """
+    Số lần gọi và thời gian (giây) theo đường dẫn lời gọi dạng "iterate;build_solution;select_activity",
+    các bộ đếm (quét J_k, số lần tính eta, kiểm tra tài nguyên, bị từ chối, trì hoãn, nhảy sự kiện, ...)
+    và số liệu của từng kiến, gom theo vòng lặp.
+    """
+    # Bộ đếm của từng kiến: quét J_k để chọn hoạt động, số lần tính tau^alpha * eta^beta, số cặp (t, j) được
+    # kiểm tra tài nguyên và bị từ chối, lần lên lịch thất bại (xây dựng từng đơn vị thời gian),
+    # lần trì hoãn, bước t tăng vì J_k rỗng và lần nhảy tới sự kiện kế tiếp vì không có ứng viên
+    ANT_COUNTERS = ("jk_scans", "eta_evaluations", "resource_checks", "rejections", "failed_placements",
+                    "delays", "idle_steps", "event_jumps")
+
+    def __init__(self):
+        self.iterations = []  # Số liệu của các vòng lặp đã xong (xem end_iteration)
+        self.begin_iteration()
+
+    def begin_iteration(self):
+        self.calls = {}
+        self.seconds = {}
+        self.counters = {}
+        self.ants = []  # Mỗi kiến: thời gian xây dựng và các bộ đếm riêng
+
+    def time(self, path, seconds, calls=1):
+        self.calls[path] = self.calls.get(path, 0) + calls
+        self.seconds[path] = self.seconds.get(path, 0.0) + seconds
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def new_ant(self):
+        """Bộ đếm của một kiến mới, được cộng vào bộ đếm chung khi đóng vòng lặp"""
+        ant = dict.fromkeys(self.ANT_COUNTERS, 0)
+        ant["seconds"] = 0.0
+        self.ants.append(ant)
+        return ant
+
+    def merge(self, other):
+        """Gộp số liệu của một Profiler khác (các kiến xây dựng trong tiến trình con)"""
+        for path, calls in other.calls.items():
+            self.time(path, other.seconds[path], calls)
+        for name, value in other.counters.items():
+            self.count(name, value)
+        self.ants.extend(other.ants)
+
+    def end_iteration(self, iteration):
+        """Đóng vòng lặp, trả về số liệu của nó"""
+        for name in self.ANT_COUNTERS:
+            self.count(name, sum(ant[name] for ant in self.ants))
+        record = {"iteration": iteration, "calls": self.calls, "seconds": self.seconds,
+                  "counters": self.counters, "ants": self.ants}
+        self.iterations.append(record)
+        self.begin_iteration()
+        return record
+
+    def report(self):
+        """Báo cáo dạng dict (ghi được ra JSON): tổng trên mọi vòng lặp và số liệu từng vòng lặp"""
+        calls, seconds, counters = {}, {}, {}
+        for record in self.iterations:
+            for path, value in record["calls"].items():
+                calls[path] = calls.get(path, 0) + value
+                seconds[path] = seconds.get(path, 0.0) + record["seconds"][path]
+            for name, value in record["counters"].items():
+                counters[name] = counters.get(name, 0) + value
+        return {"iterations": len(self.iterations), "calls": calls, "seconds": seconds,
+                "self_seconds": self.self_seconds(seconds), "counters": counters,
+                "per_iteration": self.iterations}
+
+    @staticmethod
+    def self_seconds(seconds):
+        """Thời gian riêng của mỗi đường dẫn: thời gian trừ thời gian của các đường dẫn con trực tiếp"""
+        own = dict(seconds)
+        for path, value in seconds.items():
+            parent = path.rpartition(";")[0]
+            if parent in own:
+                own[parent] -= value
+        return {path: max(value, 0.0) for path, value in own.items()}
+
+    def export(self, path):
+        """
+        Ghi báo cáo ra file theo phần mở rộng: .json (report), .prof/.pstats (định dạng của cProfile,
+        đọc bằng pstats.Stats, snakeviz, gprof2dot), còn lại là stack gộp cho flame graph
+        (mỗi dòng "iterate;build_solution;select_activity <micro giây>", dùng với flamegraph.pl, speedscope).
+        """
+        report = self.report()
+        if path.endswith(".json"):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        elif path.endswith((".prof", ".pstats")):
+            with open(path, "wb") as f:
+                marshal.dump(self.pstats(report), f)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, value in sorted(report["self_seconds"].items()):
+                    f.write(f"{stack} {int(round(value * 1e6))}\n")
+
+    @staticmethod
+    def pstats(report):
+        """Bảng thống kê theo định dạng của cProfile: (file, dòng, hàm) -> (cc, nc, tt, ct, callers)"""
+        def key(path):
+            return ("DDACS_Algorithm.py", 0, path.rpartition(";")[2])
+
+        stats = {}
+        for path, calls in report["calls"].items():
+            tt, ct = report["self_seconds"][path], report["seconds"][path]
+            cc, nc, total_tt, total_ct, callers = stats.get(key(path), (0, 0, 0.0, 0.0, {}))
+            parent = path.rpartition(";")[0]
+            if parent:
+                c, n, t, total = callers.get(key(parent), (0, 0, 0.0, 0.0))
+                callers[key(parent)] = (c + calls, n + calls, t + tt, total + ct)
+            stats[key(path)] = (cc + calls, nc + calls, total_tt + tt, total_ct + ct, callers)
+        return stats
+
 # Lớp DDACS
 class DDACS:
-    def __init__(self, N, T, c, c1, ant, alpha, beta, rho, delta, q0, q1, max_iter, p, R, r, predecessors, successors):
+    def __init__(self, N, T, c, c1, ant, alpha, beta, rho, delta, q0, q1, max_iter, p, R, r, predecessors, successors,
+                 seed=None, n_jobs=None, event_driven=False, lazy_evaporation=False, pheromone_dtype=np.float64,
+                 improve=False, improvement_passes=2, validate=False, prune=False, batched=False, profile=False,
+                 problem=None):
+        # problem: Problem dùng chung (xem from_problem); khi có, các mảng và E/L tĩnh được lấy từ đó
+        self.problem = problem
         self.N = N  # Số hoạt động
         self.T = T  # Thời gian tối đa
         self.c = c
@@ -49,13 +395,110 @@ class DDACS:
         self.q1 = q1
         self.max_iter = max_iter
         self.p = p  # Thời gian thực hiện
+        self.durations = np.array(p) if problem is None else problem.durations  # Dạng mảng (N + 2,)
         self.R = R  # Giới hạn tài nguyên
         self.r = r  # Yêu cầu tài nguyên
+        if problem is None:
+            self.capacity = np.array(R)  # Giới hạn tài nguyên dạng mảng (K,)
+            self.demand = np.array(r).reshape(N + 2, len(R))  # Yêu cầu tài nguyên dạng mảng (N + 2, K)
+        else:
+            self.capacity, self.demand = problem.capacity, problem.demand
         self.predecessors = predecessors
         self.successors = successors
-        self.tau = np.ones((T, N + 2)) * 0.1  # Ma trận pheromone
-        self.E, self.L = calculate_E_L(predecessors, successors, p, N)
+        self.build_adjacency()
+        # Ma trận pheromone: ndarray dày, hoặc LazyPheromone (bay hơi qua một hệ số chung) khi lazy_evaporation
+        if lazy_evaporation:
+            self.tau = LazyPheromone((T, N + 2), 0.1, dtype=pheromone_dtype)
+        else:
+            self.tau = np.ones((T, N + 2), dtype=pheromone_dtype) * 0.1
+        if problem is None:
+            self.E, self.L = calculate_E_L(predecessors, successors, p, N)
+            self.lower_bound = compute_lower_bound(predecessors, p, R, r, N)  # Cận dưới của makespan
+        else:
+            self.E, self.L = problem.E.tolist(), problem.L.tolist()  # L được quy tắc động điều chỉnh
+            self.lower_bound = problem.lower_bound
+        self.static_L = list(self.L)  # L tĩnh của dự án (trước điều chỉnh động), dùng khi dự án thay đổi
         self.tau0 = 0.01  # Giá trị pheromone ban đầu
+        self.eta_beta = self.eta_columns(range(N + 2))  # Bảng eta^beta kích thước T x (N + 2)
+        self.seed = seed
+        self.random = random.Random(seed) if seed is not None else random  # Nguồn ngẫu nhiên của thuật toán
+        # n_jobs=None: các kiến chạy tuần tự trên cùng ma trận pheromone.
+        # n_jobs>=1: các kiến của một vòng lặp chạy trên bản sao pheromone trong n_jobs tiến trình,
+        # mỗi kiến một seed riêng, cập nhật cục bộ được gộp lại theo thứ tự kiến.
+        self.n_jobs = n_jobs
+        # event_driven=True: t nhảy thẳng tới sự kiện kế tiếp thay vì tăng từng đơn vị (xem build_solution_events)
+        self.event_driven = event_driven
+        # improve=True: áp dụng forward-backward improvement cho lời giải tốt nhất của mỗi vòng lặp
+        self.improve = improve
+        self.improvement_passes = improvement_passes
+        # validate=True: kiểm tra lời giải của mọi kiến bằng validate_schedules, chỉ lời giải
+        # đầy đủ và khả thi mới được nhận làm lời giải tốt nhất. Cần event_driven=True (hoặc batched=True):
+        # xây dựng từng đơn vị thời gian coi hoạt động sau là sẵn sàng khi các hoạt động trước đã bắt đầu,
+        # chưa chắc đã kết thúc, nên phần lớn kiến bị loại và lần chạy thường trả về makespan vô hạn
+        self.validate = validate
+        if validate and not (event_driven or batched):
+            warnings.warn("validate=True với cách xây dựng từng đơn vị thời gian: phần lớn lời giải vi phạm "
+                          "quan hệ phụ thuộc và bị loại; dùng event_driven=True", stacklevel=2)
+        # prune=True: bỏ kiến ngay khi lời giải dở dang chắc chắn không tốt hơn incumbent
+        # (makespan của lịch đầy đủ, khả thi tốt nhất đã biết)
+        self.prune = prune
+        # batched=True: mọi kiến của một vòng lặp được xây dựng cùng lúc theo sự kiện trên các mảng
+        # kiến x hoạt động (xem build_batch), thay cho n_jobs; kết quả cố định theo seed.
+        # Các kiến chạy trong tiến trình hiện tại, n_jobs bị bỏ qua nên bộ giải không bị pickle
+        self.batched = batched
+        # profile=True: đếm và đo thời gian các thao tác trên đường nóng (xem Profiler),
+        # số liệu của mỗi vòng lặp nằm trong khóa "profile" của thống kê vòng lặp
+        self.profiler = Profiler() if profile else None
+        # Trạng thái lần chạy (lời giải tốt nhất, số vòng lặp, thống kê, ...) đã được tạo bởi reset,
+        # bởi một lần chạy trước hoặc load_checkpoint; run(resume=True) chỉ chạy tiếp khi started
+        self.started = False
+        # Makespan của lịch đầy đủ, khả thi tốt nhất đã biết: cận trên dùng khi cắt tỉa (prune=True).
+        # Khác best_makespan khi validate=False, vì lời giải tốt nhất khi đó có thể dở dang hoặc vi phạm ràng buộc
+        self.incumbent = float('inf')
+
+    @classmethod
+    def from_problem(cls, problem, T, c, c1, ant, alpha, beta, rho, delta, q0, q1, max_iter, **options):
+        """Tạo DDACS trên một Problem dùng chung (nhiều đàn kiến có thể dùng cùng một Problem)"""
+        return cls(problem.N, T, c, c1, ant, alpha, beta, rho, delta, q0, q1, max_iter, problem.p, problem.R,
+                   problem.r, problem.predecessors, problem.successors, problem=problem, **options)
+
+    def build_adjacency(self):
+        """Các hoạt động được giải phóng khi một hoạt động được lên lịch, và danh sách cung (i, j) dạng mảng"""
+        if self.problem is not None:
+            self.released_by = self.problem.successors
+            self.edge_from, self.edge_to = self.problem.edge_from, self.problem.edge_to
+            self.succ_ptr, self.succ_idx = self.problem.succ_ptr, self.problem.succ_idx
+            self.tail, self.hops = self.problem.tail.tolist(), self.problem.hops.tolist()
+            return
+        self.released_by = [[] for _ in range(self.N + 2)]
+        for j in range(self.N + 2):
+            for i in self.predecessors[j]:
+                self.released_by[i].append(j)
+        self.edge_from = np.array([i for j in range(self.N + 2) for i in self.predecessors[j]], dtype=int)
+        self.edge_to = np.array([j for j in range(self.N + 2) for _ in self.predecessors[j]], dtype=int)
+        # Danh sách hoạt động sau dạng CSR: released_by[i] là succ_idx[succ_ptr[i]:succ_ptr[i + 1]]
+        self.succ_ptr = np.concatenate(([0], np.cumsum([len(row) for row in self.released_by]))).astype(np.int32)
+        self.succ_idx = np.array([j for row in self.released_by for j in row], dtype=np.int32)
+        # Cận dưới phần còn lại từ mỗi hoạt động tới hoạt động kết thúc (thứ tự chỉ số là thứ tự tô-pô):
+        # tail_j = p_j + max tail của các hoạt động sau (xây dựng theo sự kiện),
+        # hops_j = số bước tới hoạt động kết thúc (xây dựng từng đơn vị thời gian, mỗi bước t tăng ít nhất 1)
+        self.tail = [0] * (self.N + 2)
+        self.hops = [0] * (self.N + 2)
+        for j in range(self.N + 1, -1, -1):
+            after = self.released_by[j]
+            self.tail[j] = self.p[j] + max((self.tail[i] for i in after), default=0)
+            self.hops[j] = 1 + max(self.hops[i] for i in after) if after else 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if state["random"] is random:
+            state["random"] = None  # Không pickle được module random
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.random is None:
+            self.random = random
 
     # Hàm heuristic eta
     def eta(self, t, p_j, E_j, L_j):
@@ -69,25 +512,136 @@ class DDACS:
 
         return 1 / denominator if denominator > 0 else 1e-6
 
-    def check_resource(self, t, j, solution):
-        """Kiểm tra tài nguyên có đủ cho hoạt động j tại t"""
-        for tt in range(t, t + self.p[j]):
-            if tt >= self.T:
-                return False
-            used = np.zeros(len(self.R))
-            for i in range(self.N + 2):
-                if solution[i] != -1 and solution[i] <= tt < solution[i] + self.p[i]:
-                    used += self.r[i]
-            if any(used[k] + self.r[j][k] > self.R[k] for k in range(len(self.R))):
-                return False
-        return True
-
-    def build_solution(self):
-        """Xây dựng giải pháp cho một kiến"""
+    def eta_columns(self, columns):
+        """Tính eta^beta cho mọi t và các hoạt động trong columns (cùng công thức với eta)"""
+        columns = list(columns)
+        times = np.arange(self.T)[:, None]
+        E = np.array([self.E[j] for j in columns])
+        L = np.array([self.L[j] for j in columns])
+        root = np.array([nth_root(self.p[j], self.c) for j in columns])
+
+        d = np.abs(L - times)
+        late = times >= L
+        denominator = np.where(late, (2 - d / self.c1) * root, (d + 1) * root)
+        valid = ((E <= times) | late) & (denominator > 0)
+        eta = np.full(d.shape, 1e-6)
+        eta[valid] = 1 / denominator[valid]
+        return eta ** self.beta
+
+    def check_resource(self, t, j, usage):
+        """Kiểm tra tài nguyên có đủ cho hoạt động j tại t (usage: mức sử dụng T x K)"""
+        if t + self.p[j] > self.T:
+            return False
+        return bool(np.all(usage[t:t + self.p[j]] + self.demand[j] <= self.capacity))
+
+    def resource_candidates(self, t, jobs, usage):
+        """
+        Các hoạt động trong jobs đủ tài nguyên tại t (cùng kết quả với check_resource cho từng j),
+        kiểm tra cả nhóm bằng một phép so sánh trên mảng |jobs| x max p_j x K.
+        """
+        if len(jobs) < 4:  # Nhóm nhỏ: gọi check_resource rẻ hơn
+            return [j for j in jobs if self.check_resource(t, j, usage)]
+        index = np.array(jobs)
+        lengths = self.durations[index]
+        window = usage[t:t + int(lengths.max())]
+        fits = np.all(window[None, :, :] + self.demand[index][:, None, :] <= self.capacity, axis=2)
+        # Số thời điểm liên tiếp đủ tài nguyên tính từ t
+        run = np.where(fits.all(axis=1), fits.shape[1], np.argmin(fits, axis=1))
+        ok = (run >= lengths) & (t + lengths <= self.T)
+        return [j for j, good in zip(jobs, ok.tolist()) if good]
+
+    def select_activity(self, t, J_k, tau, rng):
+        """Quy tắc chuyển trạng thái: chọn hoạt động j thuộc J_k tại t, trả về (j, q)"""
+        q = rng.random()
+        ready = np.array(J_k)
+        values = (tau[t, ready] ** self.alpha) * self.eta_beta[t, ready]
+        # Kiến chọn hoạt động j thuôc J_k(t) dựa trên hai trường hợp:
+        if q <= self.q0:
+            j = J_k[int(np.argmax(values))]
+        else:
+            total = values.sum()
+            if total > 0 and np.isfinite(total):
+                cumulative = np.cumsum(values / total)
+                k = bisect_right(cumulative, rng.random() * cumulative[-1])
+                j = J_k[min(k, len(J_k) - 1)]
+            else:
+                j = rng.choice(J_k)
+        return j, q
+
+    def profiled_operations(self, ant):
+        """
+        select_activity, check_resource và resource_candidates có đo thời gian và đếm vào kiến ant (profile=True).
+        Các hàm xây dựng chỉ dùng chúng khi bật profile, nên khi tắt không tốn thêm chi phí.
+        """
+        profiler, clock = self.profiler, time.perf_counter
+        scans_on_select = not self.event_driven  # Xây dựng theo sự kiện quét J_k khi tìm ứng viên
+
+        def select_activity(t, J_k, tau, rng):
+            start = clock()
+            result = self.select_activity(t, J_k, tau, rng)
+            profiler.time("iterate;build_solution;select_activity", clock() - start)
+            ant["jk_scans"] += scans_on_select
+            ant["eta_evaluations"] += len(J_k)
+            return result
+
+        def check_resource(t, j, usage):
+            start = clock()
+            result = self.check_resource(t, j, usage)
+            profiler.time("iterate;build_solution;check_resource", clock() - start)
+            ant["resource_checks"] += 1
+            ant["rejections"] += not result
+            return result
+
+        def resource_candidates(t, jobs, usage):
+            start = clock()
+            result = self.resource_candidates(t, jobs, usage)
+            profiler.time("iterate;build_solution;resource_candidates", clock() - start)
+            ant["jk_scans"] += 1
+            ant["resource_checks"] += len(jobs)
+            ant["rejections"] += len(jobs) - len(result)
+            return result
+
+        return select_activity, check_resource, resource_candidates
+
+    def timed_build(self, rng=None, tau=None):
+        """build_solution kèm thời gian xây dựng (giây)"""
+        start = time.perf_counter()
+        solution = self.build_solution(rng, tau)
+        seconds = time.perf_counter() - start
+        if self.profiler is not None:
+            self.profiler.time("iterate;build_solution", seconds)
+            self.profiler.ants[-1]["seconds"] = seconds
+        return solution, seconds
+
+    def build_solution(self, rng=None, tau=None):
+        """
+        Xây dựng giải pháp cho một kiến (rng: nguồn ngẫu nhiên, tau: ma trận pheromone dùng và cập nhật cục bộ).
+        Trả về None nếu kiến bị cắt tỉa (prune=True).
+        """
+        rng = self.random if rng is None else rng
+        tau = self.tau if tau is None else tau
+        if self.event_driven:
+            return self.build_solution_events(rng, tau)
+        incumbent = self.incumbent
+        prune = self.prune and incumbent < float('inf')
         solution = [-1] * (self.N + 2)  # Thời gian bắt đầu của mỗi hoạt động
         solution[0] = 0  # Hoạt động bắt đầu
         C = {0}  # Tập hợp hoạt động đã lên lịch
+        # Số hoạt động trước chưa được lên lịch và tập sẵn sàng J_k (giữ theo thứ tự tăng dần)
+        remaining = [len(self.predecessors[j]) for j in range(self.N + 2)]
+        J_k = []
+        for i in self.released_by[0]:
+            remaining[i] -= 1
+        for j in range(1, self.N + 2):
+            if remaining[j] == 0:
+                J_k.append(j)
+        usage = np.zeros((self.T, len(self.R)), dtype=self.demand.dtype)  # Mức sử dụng tài nguyên theo thời gian
+        usage[:self.p[0]] += self.demand[0]
         t = 0
+        select_activity, check_resource, ant = self.select_activity, self.check_resource, None
+        if self.profiler is not None:
+            ant = self.profiler.new_ant()
+            select_activity, check_resource, _ = self.profiled_operations(ant)
 
         while len(C) < self.N + 2:
             if t >= self.T:  # Kiểm tra nếu t vượt quá kích thước của self.tau
@@ -96,100 +650,1136 @@ class DDACS:
             # Tập hợp các hoạt động có thể thực hiện J_k, bao gồm các hoạt động:
             # - Đã hoàn thành tất cả các hoạt động trước đó.
             # - Chưa được lên lịch.
-            J_k = []
-            for j in range(1, self.N + 2):
-                if j not in C and all(i in C for i in self.predecessors[j]):
-                    J_k.append(j)
+            # J_k chỉ được cập nhật khi một hoạt động được lên lịch.
             if not J_k:
+                if ant is not None:
+                    ant["idle_steps"] += 1
                 t += 1
                 continue
 
+            # Cắt tỉa: hoạt động kết thúc không thể bắt đầu trước t + hops_j với mọi j còn trong J_k
+            if prune and t + max(self.hops[j] for j in J_k) >= incumbent:
+                return None
+
             # Quy tắc chuyển trạng thái
-            q = random.random()
-            # Kiến chọn hoạt động j thuôc J_k(t) dựa trên hai trường hợp:
-            if q <= self.q0:
-                values = []
-                for j in J_k:
-                    values.append((j, (self.tau[t, self.L[j]] ** self.alpha) * (self.eta(t, self.p[j], self.E[j], self.L[j]) ** self.beta)))
-                j = max(values, key=lambda x: x[1])[0]
-            else:
-                pheromone_heuristic = []
-                for j in J_k:
-                    pheromone_heuristic.append((j, (self.tau[t, j] ** self.alpha) * (self.eta(t, self.p[j], self.E[j], self.L[j]) ** self.beta)))
-                total = sum(val for _, val in pheromone_heuristic)
-                if total > 0 and np.isfinite(total):
-                    probs = []
-                    for j, val in pheromone_heuristic:
-                        probs.append((j, val / total))
-                    j = random.choices([p[0] for p in probs], [p[1] for p in probs])[0]
-                else:
-                    j = random.choice(J_k)
+            j, q = select_activity(t, J_k, tau, rng)
 
             # Quy tắc trễ (10% xác suất trì hoãn)
             if self.q1 < q and t <= self.L[j]:
+                if ant is not None:
+                    ant["delays"] += 1
                 delay = q * (self.L[j] - t)
                 t += int(delay)
                 continue
 
             # Kiểm tra tài nguyên và lên lịch
-            if self.check_resource(t, j, solution) and t + self.p[j] <= self.T:
+            if check_resource(t, j, usage) and t + self.p[j] <= self.T:
                 solution[j] = t
                 C.add(j)
+                usage[t:t + self.p[j]] += self.demand[j]
+                J_k.remove(j)
+                for i in self.released_by[j]:
+                    remaining[i] -= 1
+                    if remaining[i] == 0 and i not in C:
+                        insort(J_k, i)
                 # Cập nhật pheromone cục bộ
                 for tt in range(t, t + self.p[j]):
                     if tt < self.T:
-                        self.tau[tt, j] = (1 - self.rho) * self.tau[tt, j] + self.rho * self.tau0
+                        tau[tt, j] = (1 - self.rho) * tau[tt, j] + self.rho * self.tau0
+            elif ant is not None:
+                ant["failed_placements"] += 1
             t += 1
 
         return solution
 
+    def build_solution_events(self, rng, tau):
+        """
+        Xây dựng giải pháp theo sự kiện. Tại t chỉ xét các hoạt động mà mọi hoạt động trước đã kết thúc
+        và đủ tài nguyên; khi không hoạt động nào bắt đầu được, t nhảy tới sự kiện kế tiếp
+        (một hoạt động kết thúc, giải phóng tài nguyên và các hoạt động sau).
+        """
+        solution = [-1] * (self.N + 2)
+        solution[0] = 0
+        scheduled = 1
+        remaining = [len(self.predecessors[j]) for j in range(self.N + 2)]
+        release = [0] * (self.N + 2)  # Thời điểm mọi hoạt động trước đã kết thúc
+        for i in self.released_by[0]:
+            remaining[i] -= 1
+            release[i] = max(release[i], self.p[0])
+        J_k = [j for j in range(1, self.N + 2) if remaining[j] == 0]
+        usage = np.zeros((self.T, len(self.R)), dtype=self.demand.dtype)
+        usage[:self.p[0]] += self.demand[0]
+        finish_events = [self.p[0]]  # Heap thời điểm kết thúc của các hoạt động đã lên lịch
+        t = 0
+
+        def next_event():
+            while finish_events and finish_events[0] <= t:
+                heapq.heappop(finish_events)
+            events = [release[j] for j in J_k if release[j] > t]
+            if finish_events:
+                events.append(finish_events[0])
+            return min(events) if events else None
+
+        incumbent = self.incumbent
+        prune = self.prune and incumbent < float('inf')
+        # Khối lượng công việc p_j * r_jk còn lại của các hoạt động chưa lên lịch, theo từng tài nguyên
+        work = (self.durations[1:, None] * self.demand[1:]).sum(axis=0)
+        positive = self.capacity > 0
+
+        checked = -1  # Thời điểm kiểm tra cắt tỉa gần nhất
+        select_activity, resource_candidates, ant = self.select_activity, self.resource_candidates, None
+        if self.profiler is not None:
+            ant = self.profiler.new_ant()
+            select_activity, _, resource_candidates = self.profiled_operations(ant)
+
+        while scheduled < self.N + 2 and t < self.T:
+            # Cắt tỉa (khi t thay đổi): mọi hoạt động chưa lên lịch có tổ tiên trong J_k, nên makespan
+            # cuối cùng không nhỏ hơn max(t, release_j) + tail_j với j thuộc J_k; và công việc còn lại
+            # chỉ dùng được phần tài nguyên còn trống từ t trở đi trước incumbent
+            if prune and t != checked:
+                checked = t
+                if max(max(t, release[j]) + self.tail[j] for j in J_k) >= incumbent:
+                    return None
+                if incumbent <= self.T:
+                    # Để makespan < incumbent, mọi hoạt động phải kết thúc trong [t, incumbent - 1)
+                    free = (self.capacity - usage[t:int(incumbent) - 1])[:, positive].sum(axis=0)
+                    if np.any(free < work[positive]):
+                        return None
+            candidates = resource_candidates(t, [j for j in J_k if release[j] <= t], usage)
+            if not candidates:
+                if ant is not None:
+                    ant["event_jumps"] += 1
+                t = next_event()
+                if t is None:
+                    break
+                continue
+
+            j, q = select_activity(t, candidates, tau, rng)
+
+            # Quy tắc trễ: không trì hoãn quá sự kiện kế tiếp
+            if self.q1 < q and t <= self.L[j]:
+                if ant is not None:
+                    ant["delays"] += 1
+                target = t + int(q * (self.L[j] - t))
+                event = next_event()
+                t = target if event is None else min(target, event)
+                continue
+
+            solution[j] = t
+            scheduled += 1
+            usage[t:t + self.p[j]] += self.demand[j]
+            work -= self.p[j] * self.demand[j]
+            heapq.heappush(finish_events, t + self.p[j])
+            J_k.remove(j)
+            for i in self.released_by[j]:
+                remaining[i] -= 1
+                release[i] = max(release[i], t + self.p[j])
+                if remaining[i] == 0 and solution[i] == -1:
+                    insort(J_k, i)
+            # Cập nhật pheromone cục bộ
+            tau[t:t + self.p[j], j] = (1 - self.rho) * tau[t:t + self.p[j], j] + self.rho * self.tau0
+            # Giữ nguyên t: có thể bắt đầu thêm hoạt động tại cùng thời điểm
+
+        return solution
+
+    def schedule_makespan(self, solution):
+        """Makespan của lời giải: thời điểm bắt đầu của hoạt động kết thúc, hoặc thời điểm kết thúc muộn nhất"""
+        if solution[self.N + 1] != -1:
+            return solution[self.N + 1]
+        return max(solution[j] + self.p[j] for j in range(1, self.N + 1) if solution[j] != -1)
+
+    def is_precedence_feasible(self, solution):
+        """Lời giải đầy đủ và mọi hoạt động chỉ bắt đầu sau khi các hoạt động trước đã kết thúc"""
+        if -1 in solution:
+            return False
+        return all(solution[i] + self.p[i] <= solution[j]
+                   for j in range(self.N + 2) for i in self.predecessors[j])
+
+    def validate_schedules(self, solutions, details=True):
+        """
+        Kiểm tra một lời giải (list độ dài N + 2) hoặc một lô lời giải (mảng B x (N + 2)) cùng lúc:
+        tính đầy đủ (không còn -1), quan hệ phụ thuộc (S_i + p_i <= S_j) và giới hạn từng tài nguyên theo thời gian.
+        Trả về dict: makespan (thời điểm kết thúc muộn nhất của các hoạt động đã lên lịch), complete,
+        precedence (số cung vi phạm), overload (số cặp (t, k) vượt giới hạn), feasible; với details=True
+        thêm missing (các hoạt động chưa lên lịch), precedence_violations (các cặp (i, j)) và
+        resource_violations (các bộ (t, k, phần vượt)). Với một lời giải các giá trị là số/mảng,
+        với một lô là mảng độ dài B (chi tiết là danh sách B mảng).
+        """
+        S = np.asarray(solutions)
+        single = S.ndim == 1
+        S = np.atleast_2d(S)
+        B = S.shape[0]
+        scheduled = S != -1
+        complete = scheduled.all(axis=1)
+        finish = np.where(scheduled, S + self.durations, 0)
+        makespan = finish.max(axis=1)
+
+        # Cung (i, j) vi phạm: j đã lên lịch và i chưa lên lịch hoặc chưa kết thúc khi j bắt đầu
+        late = scheduled[:, self.edge_to] & (~scheduled[:, self.edge_from] |
+                                             (finish[:, self.edge_from] > S[:, self.edge_to]))
+        precedence = late.sum(axis=1)
+
+        # Mức sử dụng theo thời gian: cộng yêu cầu tại thời điểm bắt đầu, trừ tại thời điểm kết thúc
+        horizon = max(self.T, int(makespan.max())) + 1
+        batch, activity = np.nonzero(scheduled & (self.durations > 0))
+        profile = np.zeros((B, horizon + 1, len(self.R)), dtype=self.demand.dtype)
+        np.add.at(profile, (batch, S[batch, activity]), self.demand[activity])
+        np.add.at(profile, (batch, finish[batch, activity]), -self.demand[activity])
+        usage = np.cumsum(profile[:, :horizon], axis=1)
+        excess = usage - self.capacity
+        over = excess > 0
+        overload = over.sum(axis=(1, 2))
+
+        report = {
+            "makespan": makespan,
+            "complete": complete,
+            "precedence": precedence,
+            "overload": overload,
+            "feasible": complete & (precedence == 0) & (overload == 0),
+        }
+        if details:
+            report["missing"] = [np.flatnonzero(~row) for row in scheduled]
+            report["precedence_violations"] = [
+                np.stack([self.edge_from[row], self.edge_to[row]], axis=1) for row in late]
+            report["resource_violations"] = [
+                np.column_stack(np.nonzero(over[b]) + (excess[b][over[b]],)) for b in range(B)]
+        if single:
+            report = {key: value[0] if key in ("missing", "precedence_violations", "resource_violations")
+                      else value[0].item() for key, value in report.items()}
+        return report
+
+    def resource_usage(self, solution):
+        """Mức sử dụng tài nguyên T x K của lời giải"""
+        usage = np.zeros((self.T, len(self.R)), dtype=self.demand.dtype)
+        rows, columns = self.occupied_cells(solution)
+        np.add.at(usage, rows, self.demand[columns])
+        return usage
+
+    def feasible_starts(self, usage, j, lo, hi):
+        """Các thời điểm st trong [lo, hi] mà hoạt động j đủ tài nguyên trên [st, st + p_j)"""
+        hi = min(hi, self.T - self.p[j])
+        if hi < lo:
+            return np.empty(0, dtype=int)
+        if self.p[j] == 0:
+            return np.arange(lo, hi + 1)
+        window = usage[lo:hi + self.p[j]]
+        blocked = np.any(window + self.demand[j] > self.capacity, axis=1)
+        counts = np.concatenate(([0], np.cumsum(blocked)))
+        return lo + np.flatnonzero(counts[self.p[j]:] == counts[:-self.p[j]])
+
+    def forward_backward_improvement(self, solution):
+        """
+        Forward-backward improvement (justification) cho một lời giải khả thi:
+        lượt lùi dời từng hoạt động (theo thời điểm kết thúc giảm dần) sang phải muộn nhất có thể,
+        lượt tiến dời từng hoạt động (theo thời điểm bắt đầu tăng dần) sang trái sớm nhất có thể.
+        Mức sử dụng tài nguyên được cập nhật tăng dần khi dời từng hoạt động.
+        """
+        start = list(solution)
+        usage = self.resource_usage(start)
+        end = self.N + 1
+
+        for _ in range(self.improvement_passes):
+            makespan = start[end]
+
+            # Lượt lùi: hoạt động kết thúc dời về makespan
+            for j in sorted(range(1, end), key=lambda j: (start[j] + self.p[j], start[j]), reverse=True):
+                latest = min((start[i] for i in self.released_by[j]), default=makespan) - self.p[j]
+                if latest <= start[j]:
+                    continue
+                usage[start[j]:start[j] + self.p[j]] -= self.demand[j]
+                start[j] = int(self.feasible_starts(usage, j, start[j], latest)[-1])
+                usage[start[j]:start[j] + self.p[j]] += self.demand[j]
+
+            # Lượt tiến: hoạt động kết thúc cũng được dời sớm nhất có thể
+            for j in sorted(range(1, end + 1), key=lambda j: start[j]):
+                earliest = max((start[i] + self.p[i] for i in self.predecessors[j]), default=0)
+                if earliest >= start[j]:
+                    continue
+                usage[start[j]:start[j] + self.p[j]] -= self.demand[j]
+                start[j] = int(self.feasible_starts(usage, j, earliest, start[j])[0])
+                usage[start[j]:start[j] + self.p[j]] += self.demand[j]
+
+            if start[end] >= makespan:
+                break
+        return start
+
+    def occupancy_mask(self, solution):
+        """Mặt nạ T x (N + 2): True tại (t, j) nếu hoạt động j đang thực hiện tại t"""
+        start = np.array(solution)
+        times = np.arange(self.T)[:, None]
+        return (start != -1) & (times >= start) & (times < start + self.durations)
+
+    def occupied_cells(self, solution):
+        """Chỉ số (t, j) của các ô mà hoạt động j đang thực hiện tại t, theo thứ tự j tăng dần"""
+        start = np.array(solution)
+        scheduled = np.flatnonzero((start != -1) & (self.durations > 0))
+        lengths = self.durations[scheduled]
+        columns = np.repeat(scheduled, lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        rows = np.repeat(start[scheduled], lengths) + offsets
+        inside = (rows >= 0) & (rows < self.T)
+        return rows[inside], columns[inside]
+
     def global_update(self, best_solution, best_makespan, prev_best_makespan):
-        """Cập nhật pheromone toàn cục"""
-        for t in range(self.T):
-            for j in range(self.N + 2):
-                if best_solution[j] != -1 and t in range(best_solution[j], best_solution[j] + self.p[j]):
-                    delta_ms = (1 + max(0, prev_best_makespan - best_makespan)) / best_makespan
-                    self.tau[t, j] = (1 - self.delta) * self.tau[t, j] + self.delta * delta_ms
-                else:
-                    self.tau[t, j] = (1 - self.delta) * self.tau[t, j]
+        """Cập nhật pheromone toàn cục (chỉ ghi vào các ô của lời giải tốt nhất, phần bay hơi nhân chung)"""
+        rows, columns = self.occupied_cells(best_solution)
+        self.tau *= (1 - self.delta)
+        if len(rows):
+            delta_ms = (1 + max(0, prev_best_makespan - best_makespan)) / best_makespan
+            self.tau[rows, columns] += self.delta * delta_ms
 
     def dynamic_rule(self, best_solution):
         """Điều chỉnh L_j theo quy tắc động"""
+        changed = []
         for j in range(1, self.N + 1):
             S_j = best_solution[j]
             if S_j > self.L[j]:
                 self.L[j] = S_j
+                changed.append(j)
+        # Chỉ tính lại các cột eta^beta có L_j thay đổi
+        if changed:
+            self.eta_beta[:, changed] = self.eta_columns(changed)
+
+    def local_update(self, solution):
+        """Cập nhật pheromone cục bộ cho các ô (t, j) mà lời giải của một kiến đã dùng"""
+        cells = self.occupied_cells(solution)
+        self.tau[cells] = (1 - self.rho) * self.tau[cells] + self.rho * self.tau0
+
+    def ant_seeds(self, base_seed, iteration):
+        """Seed riêng cho từng kiến của vòng lặp iteration, cố định theo base_seed"""
+        return [int(np.random.SeedSequence([base_seed, iteration, k]).generate_state(1)[0]) for k in range(self.ant)]
+
+    def worker_copy(self):
+        """
+        Bản sao gọn gửi cho tiến trình xây dựng kiến: không kèm thống kê các vòng lặp (history, tăng dần
+        theo lần chạy) và số liệu profile đã thu; các thuộc tính khác dùng chung với bộ giải.
+        Bảng eta^beta (cùng kích thước với tau) được tính lại trong tiến trình con từ E và L, nên mỗi phần
+        việc chỉ mang Problem, bản sao tau, L và các seed.
+        """
+        worker = copy.copy(self)
+        worker.history = []
+        worker.eta_beta = None
+        if self.profiler is not None:
+            worker.profiler = Profiler()
+        return worker
+
+    def build_parallel(self, seeds, executor=None):
+        """
+        Xây dựng lời giải cho các kiến trên cùng một bản sao pheromone,
+        sau đó gộp cập nhật cục bộ theo thứ tự kiến (kết quả không phụ thuộc số tiến trình).
+        """
+        if executor is None:
+            parts = [_build_ants(self, seeds)]
+        else:
+            size = -(-len(seeds) // self.n_jobs)
+            chunks = [seeds[i:i + size] for i in range(0, len(seeds), size)]
+            worker = self.worker_copy()
+            parts = list(executor.map(_build_ants, [worker] * len(chunks), chunks))
+        built = [pair for part, _ in parts for pair in part]
+        if self.profiler is not None:
+            for _, profiler in parts:
+                self.profiler.merge(profiler)
+        for solution, _ in built:
+            if solution is not None:
+                self.local_update(solution)
+        return built
+
+    def build_batch(self, rng):
+        """
+        Xây dựng lời giải cho mọi kiến của vòng lặp cùng lúc, theo sự kiện như build_solution_events.
+        Trạng thái của các kiến là các mảng kiến x hoạt động (sẵn sàng, bắt đầu, kết thúc, thời điểm giải phóng)
+        cùng mức sử dụng tài nguyên kiến x T x K; mỗi bước, mọi kiến còn chạy cùng thực hiện một thao tác
+        (lên lịch, trì hoãn hoặc nhảy tới sự kiện kế tiếp) bằng vài phép toán mảng, quy tắc chuyển trạng thái
+        được lấy mẫu cho cả lô (rng: numpy Generator).
+        Như build_parallel, các kiến đọc pheromone đầu vòng lặp (cập nhật cục bộ của một kiến chỉ chạm các cột
+        nó đã lên lịch) và cập nhật cục bộ được gộp sau theo thứ tự kiến. Trả về các cặp (lời giải, thời gian).
+        """
+        begin = time.perf_counter()
+        A, n, T = self.ant, self.N + 2, self.T
+        p, demand = self.durations, self.demand
+        tail, L = np.array(self.tail), np.array(self.L)
+        tau = np.asarray(self.tau)
+        never = np.iinfo(np.int64).max
+        incumbent = self.incumbent
+        prune = self.prune and incumbent < float('inf')
+
+        start = np.full((A, n), -1, dtype=np.int64)
+        finish = np.full((A, n), never, dtype=np.int64)
+        release = np.zeros((A, n), dtype=np.int64)
+        remaining = np.tile(np.bincount(self.edge_to, minlength=n), (A, 1))
+        ready = np.zeros((A, n), dtype=bool)
+        usage = np.zeros((A, T, len(self.R)), dtype=demand.dtype)
+        scheduled = np.zeros(A, dtype=np.int64)
+        t = np.zeros(A, dtype=np.int64)
+        running = np.ones(A, dtype=bool)
+        pruned = np.zeros(A, dtype=bool)
+        seconds = np.zeros(A)
+        profiler, clock = self.profiler, time.perf_counter
+        if profiler is not None:
+            tally = {name: np.zeros(A, dtype=np.int64) for name in Profiler.ANT_COUNTERS}
+
+        def schedule(ants, jobs):
+            """Lên lịch hoạt động jobs[i] tại t của kiến ants[i] (mỗi kiến nhiều nhất một hoạt động)"""
+            at = t[ants]
+            start[ants, jobs] = at
+            finish[ants, jobs] = at + p[jobs]
+            ready[ants, jobs] = False
+            scheduled[ants] += 1
+            lengths = p[jobs]
+            offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            usage[np.repeat(ants, lengths), np.repeat(at, lengths) + offsets] += np.repeat(demand[jobs], lengths, axis=0)
+            counts = self.succ_ptr[jobs + 1] - self.succ_ptr[jobs]
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            rows = np.repeat(ants, counts)
+            after = self.succ_idx[np.repeat(self.succ_ptr[jobs], counts) + offsets]
+            remaining[rows, after] -= 1
+            release[rows, after] = np.maximum(release[rows, after], np.repeat(at + lengths, counts))
+            ready[rows, after] = remaining[rows, after] == 0
+
+        def stop(ants, cut=False):
+            running[ants] = False
+            pruned[ants] = cut
+            seconds[ants] = time.perf_counter() - begin
+
+        schedule(np.arange(A), np.zeros(A, dtype=np.int64))
+        while True:
+            stop(running & ((scheduled >= n) | (t >= T)))
+            if not running.any():
+                break
+            # Các cặp (kiến, hoạt động sẵn sàng), theo thứ tự kiến; kiến còn chạy luôn có hoạt động sẵn sàng
+            ant, job = np.nonzero(ready & running[:, None])
+            now, free_at = t[ant], release[ant, job]
+            # Cắt tỉa: makespan cuối cùng không nhỏ hơn max(t, release_j) + tail_j với j sẵn sàng
+            if prune:
+                bound = np.full(A, -1, dtype=np.int64)
+                np.maximum.at(bound, ant, np.maximum(free_at, now) + tail[job])
+                cut = running & (bound >= incumbent)
+                if cut.any():
+                    stop(cut, cut=True)
+                    keep = running[ant]
+                    ant, job, now, free_at = ant[keep], job[keep], now[keep], free_at[keep]
+                    if ant.size == 0:
+                        break
+
+            # Ứng viên: đã giải phóng và đủ tài nguyên tại t của kiến (cửa sổ max p_j x K cho mỗi cặp)
+            if profiler is not None:
+                profiler.count("lockstep_steps")
+                tally["jk_scans"] += running
+                section = clock()
+            index = np.flatnonzero(free_at <= now)
+            lengths = p[job[index]]
+            width = max(int(lengths.max(initial=0)), 1)
+            times = now[index][:, None] + np.arange(width)
+            window = usage[ant[index][:, None], np.minimum(times, T - 1)]
+            fits = np.all(window + demand[job[index]][:, None, :] <= self.capacity, axis=2) | \
+                (np.arange(width) >= lengths[:, None])
+            good = fits.all(axis=1) & (now[index] + lengths <= T)
+            if profiler is not None:
+                tally["resource_checks"] += np.bincount(ant[index], minlength=A)
+                tally["rejections"] += np.bincount(ant[index[~good]], minlength=A)
+                profiler.time("iterate;build_batch;resource_candidates", clock() - section)
+                section = clock()
+            index = index[good]
+            owner_of, cj = ant[index], job[index]
+            has = np.zeros(A, dtype=bool)
+            has[owner_of] = True
+
+            # Quy tắc chuyển trạng thái cho cả lô, trên từng đoạn ứng viên của một kiến
+            q = rng.random(A)
+            u = rng.random(A)
+            j = np.zeros(A, dtype=np.int64)
+            if cj.size:
+                at = t[owner_of]
+                values = (tau[at, cj] ** self.alpha) * self.eta_beta[at, cj]
+                first = np.flatnonzero(np.concatenate(([True], owner_of[1:] != owner_of[:-1])))
+                owner = owner_of[first]
+                count = np.diff(np.append(first, cj.size))
+                end = first + count - 1
+
+                def first_hit(mask):
+                    """Vị trí đầu tiên của mask trong mỗi đoạn (end nếu đoạn không có)"""
+                    hits = np.flatnonzero(mask)
+                    found = hits[np.minimum(np.searchsorted(hits, first), max(hits.size - 1, 0))] if hits.size \
+                        else end
+                    return np.where((found >= first) & (found <= end), found, end)
+
+                greedy = first_hit(values == np.repeat(np.maximum.reduceat(values, first), count))
+                with np.errstate(invalid="ignore"):  # Pheromone vô hạn: tổng không hợp lệ, xử lý bên dưới
+                    cumulative = np.cumsum(values)
+                    cumulative -= np.repeat(cumulative[first] - values[first], count)
+                total = cumulative[end]
+                valid = (total > 0) & np.isfinite(total)
+                roulette = first_hit(cumulative > np.repeat(u[owner] * total, count))
+                # Tổng không hợp lệ: chọn đều trong các ứng viên
+                uniform = first + np.minimum((u[owner] * count).astype(np.int64), count - 1)
+                pick = np.where(q[owner] <= self.q0, greedy, np.where(valid, roulette, uniform))
+                j[owner] = cj[pick]
+            if profiler is not None:
+                tally["eta_evaluations"] += np.bincount(owner_of, minlength=A)
+                profiler.time("iterate;build_batch;select_activity", clock() - section)
+
+            # Sự kiện kế tiếp (chỉ cho kiến cần): một hoạt động đã lên lịch kết thúc,
+            # hoặc một hoạt động sẵn sàng được giải phóng
+            delay = has & (self.q1 < q) & (t <= L[j])
+            need = np.flatnonzero(running & (~has | delay))
+            later = np.full(A, never, dtype=np.int64)
+            if need.size:
+                ends = finish[need]
+                later[need] = np.where(ends > t[need, None], ends, never).min(axis=1)
+                np.minimum.at(later, ant, np.where(free_at > now, free_at, never))
+
+            # Kiến không có ứng viên nhảy tới sự kiện kế tiếp (hoặc dừng nếu không còn sự kiện);
+            # quy tắc trễ không trì hoãn quá sự kiện kế tiếp
+            target = t + (q * (L[j] - t)).astype(np.int64)
+            if profiler is not None:
+                tally["delays"] += delay
+                tally["event_jumps"] += running & ~has
+            stop(running & ~has & (later == never))
+            t[:] = np.where(running & ~has, later, np.where(delay, np.minimum(target, later), t))
+            go = np.flatnonzero(has & ~delay)
+            schedule(go, j[go])
+
+        for a in np.flatnonzero(~pruned):
+            self.local_update(start[a].tolist())
+        if profiler is not None:
+            profiler.time("iterate;build_batch", clock() - begin)
+            for a in range(A):
+                record = profiler.new_ant()
+                record.update({name: int(values[a]) for name, values in tally.items()}, seconds=float(seconds[a]))
+        return [(None if pruned[a] else start[a].tolist(), float(seconds[a])) for a in range(A)]
+
+    def reset(self):
+        """Khởi tạo lại lời giải tốt nhất trước một lần chạy"""
+        self.started = True
+        self.best_solution = None
+        self.best_makespan = float('inf')
+        self.prev_best_makespan = float('inf')
+        self.incumbent = float('inf')
+        self.iteration = 0
+        self.history = []  # Thống kê của từng vòng lặp (xem iterate)
+        if self.profiler is not None:
+            self.profiler = Profiler()
+        self.stale = 0  # Số vòng lặp liên tiếp không cải thiện
+        self.pruned_ants = 0  # Tổng số kiến bị cắt tỉa (prune=True)
+        self.pruned_time_saved = 0.0  # Tổng thời gian xây dựng tiết kiệm được (ước lượng, giây)
+        self.complete_builds = 0  # Số kiến xây dựng hết và tổng thời gian của chúng (để ước lượng)
+        self.complete_build_time = 0.0
+        self.stop_reason = None  # "max_iter", "time_budget", "stagnation" hoặc "lower_bound"
+        self.deadline = None  # Thời điểm (perf_counter) hết ngân sách thời gian
+        self.stop_at_lower_bound = False
+        self.base_seed = self.seed
+        if (self.n_jobs is not None or self.batched) and self.base_seed is None:
+            self.base_seed = self.random.getrandbits(32)
+
+    def pheromone_entropy(self):
+        """Entropy Shannon của ma trận pheromone chuẩn hóa (ô vô hạn chia đều toàn bộ khối lượng)"""
+        tau = np.asarray(self.tau)
+        infinite = np.isinf(tau)
+        if infinite.any():
+            return float(np.log(infinite.sum()))
+        total = tau.sum()
+        if total <= 0:
+            return 0.0
+        probs = tau[tau > 0] / total
+        return float(-(probs * np.log(probs)).sum())
+
+    def offer_incumbent(self, solution, makespan, feasible=None):
+        """
+        Nhận solution làm incumbent cho cắt tỉa nếu tốt hơn và là lịch đầy đủ, khả thi.
+        feasible: kết quả kiểm tra đã có (validate=True); None thì kiểm tra bằng validate_schedules.
+        """
+        if not self.prune or makespan >= self.incumbent:
+            return
+        if feasible is None:
+            feasible = bool(self.validate_schedules(solution, details=False)["feasible"])
+        if feasible:
+            self.incumbent = makespan
+
+    def reached_lower_bound(self):
+        """
+        Lời giải tốt nhất đạt cận dưới và là lịch đầy đủ, khả thi. Lời giải dở dang (hoạt động kết thúc
+        chưa được lên lịch) hoặc vi phạm quan hệ phụ thuộc/tài nguyên có thể có makespan nhỏ hơn cận dưới.
+        """
+        if self.best_solution is None or self.best_makespan > self.lower_bound:
+            return False
+        return bool(self.validate_schedules(self.best_solution, details=False)["feasible"])
+
+    def iterate(self, executor=None, entropy=False):
+        """
+        Một vòng lặp: các kiến xây dựng lời giải, cập nhật pheromone toàn cục và áp dụng quy tắc động.
+        Trả về thống kê của vòng lặp (makespan tốt nhất/trung bình/tệ nhất, tỷ lệ lời giải
+        chưa hoàn chỉnh, thời gian chạy). entropy=True: thêm entropy pheromone, chỉ tính khi được yêu cầu
+        vì phải duyệt cả ma trận (và tạo mảng đầy đủ từ LazyPheromone).
+        """
+        start = time.perf_counter()
+        if self.batched:
+            built = self.build_batch(np.random.default_rng([self.base_seed, self.iteration]))
+        elif self.n_jobs is None:
+            built = (self.timed_build() for _ in range(self.ant))
+        else:
+            built = self.build_parallel(self.ant_seeds(self.base_seed, self.iteration), executor)
 
-    def run(self):
-        """Chạy thuật toán DDACS"""
-        best_solution = None
-        best_makespan = float('inf')
-        prev_best_makespan = float('inf')
-
-        for _ in range(self.max_iter):
-            solutions = []
-            for _ in range(self.ant):
-                print("=================================================================================")
-                solution = self.build_solution()
-                if solution[self.N + 1] != -1:
-                    makespan = solution[self.N + 1]
+        makespans = []
+        incomplete = 0
+        infeasible = 0
+        pruned, pruned_time, complete_time = 0, 0.0, []
+        iteration_best, iteration_best_makespan = None, float('inf')
+        for solution, seconds in built:
+            if solution is None:
+                pruned += 1
+                pruned_time += seconds
+                if self.deadline is not None and time.perf_counter() >= self.deadline:
+                    self.stop_reason = "time_budget"
+                    break
+                continue
+            complete_time.append(seconds)
+            if self.validate:
+                clock = time.perf_counter()
+                report = self.validate_schedules(solution, details=False)
+                makespan, feasible = report["makespan"], report["feasible"]
+                infeasible += not feasible
+                if self.profiler is not None:
+                    self.profiler.time("iterate;validate_schedules", time.perf_counter() - clock)
+            else:
+                makespan, feasible = self.schedule_makespan(solution), True
+            if solution[self.N + 1] == -1:
+                incomplete += 1
+            makespans.append(makespan)
+            if feasible and makespan < iteration_best_makespan:
+                iteration_best, iteration_best_makespan = solution, makespan
+            if feasible and makespan < self.best_makespan:
+                self.best_makespan = makespan
+                self.best_solution = solution
+            self.offer_incumbent(solution, makespan, feasible if self.validate else None)
+
+            # Dừng ngay khi đạt cận dưới hoặc hết thời gian, không xây dựng thêm kiến
+            if self.stop_at_lower_bound and self.reached_lower_bound():
+                self.stop_reason = "lower_bound"
+                break
+            if self.deadline is not None and time.perf_counter() >= self.deadline:
+                self.stop_reason = "time_budget"
+                break
+
+        # Cải thiện lời giải tốt nhất của vòng lặp trước khi cập nhật pheromone toàn cục
+        improvement = 0
+        if self.improve and iteration_best is not None and self.is_precedence_feasible(iteration_best):
+            clock = time.perf_counter()
+            improved = self.forward_backward_improvement(iteration_best)
+            if self.profiler is not None:
+                self.profiler.time("iterate;forward_backward_improvement", time.perf_counter() - clock)
+            improvement = iteration_best_makespan - self.schedule_makespan(improved)
+            if improvement > 0:
+                iteration_best_makespan -= improvement
+                if iteration_best_makespan < self.best_makespan:
+                    self.best_makespan = iteration_best_makespan
+                    self.best_solution = improved
+                self.offer_incumbent(improved, iteration_best_makespan)
+                if self.stop_at_lower_bound and self.reached_lower_bound():
+                    self.stop_reason = "lower_bound"
+
+        # Cập nhật pheromone toàn cục và áp dụng quy tắc động (khi đã có lời giải hợp lệ)
+        if self.best_solution is not None:
+            clock = time.perf_counter()
+            self.global_update(self.best_solution, self.best_makespan, self.prev_best_makespan)
+            self.prev_best_makespan = self.best_makespan
+            middle = time.perf_counter()
+            self.dynamic_rule(self.best_solution)
+            if self.profiler is not None:
+                self.profiler.time("iterate;global_update", middle - clock)
+                self.profiler.time("iterate;dynamic_rule", time.perf_counter() - middle)
+
+        stats = {
+            "iteration": self.iteration,
+            "best_makespan": self.best_makespan,
+            "iteration_best": iteration_best_makespan,
+            "mean_makespan": sum(makespans) / len(makespans) if makespans else float('inf'),
+            "worst_makespan": max(makespans, default=float('inf')),
+            "incomplete_ratio": incomplete / len(makespans) if makespans else 0.0,
+            "improvement": improvement,
+            "wall_time": time.perf_counter() - start,
+        }
+        if entropy:
+            stats["entropy"] = self.pheromone_entropy()
+        if self.validate:
+            stats["infeasible_ratio"] = infeasible / len(makespans) if makespans else 0.0
+        if self.prune:
+            # Thời gian tiết kiệm ước lượng: kiến bị cắt tỉa lẽ ra tốn thời gian trung bình
+            # của một kiến chạy hết (trung bình trên mọi vòng lặp, vì có vòng mọi kiến đều bị cắt tỉa)
+            self.complete_builds += len(complete_time)
+            self.complete_build_time += sum(complete_time)
+            full = self.complete_build_time / self.complete_builds if self.complete_builds else 0.0
+            saved = max(0.0, pruned * full - pruned_time)
+            stats["pruned"] = pruned
+            stats["pruned_time_saved"] = saved
+            self.pruned_ants += pruned
+            self.pruned_time_saved += saved
+        if self.profiler is not None:
+            self.profiler.time("iterate", stats["wall_time"])
+            stats["profile"] = self.profiler.end_iteration(self.iteration)
+        self.history.append(stats)
+        self.iteration += 1
+        return stats
+
+    def run(self, callback=None, time_budget=None, stagnation=None, stop_at_lower_bound=True,
+            resume=False, checkpoint=None, checkpoint_interval=10, entropy=None):
+        """
+        Chạy thuật toán DDACS.
+        callback: hàm nhận thống kê của mỗi vòng lặp.
+        entropy: thêm entropy pheromone vào thống kê (và self.history); mặc định chỉ khi có callback.
+        Điều kiện dừng: max_iter vòng lặp, time_budget giây, stagnation vòng lặp liên tiếp không cải thiện,
+        hoặc đạt cận dưới self.lower_bound với một lịch đầy đủ và khả thi (xem reached_lower_bound).
+        Lý do dừng được lưu trong self.stop_reason.
+        resume=True: chạy tiếp từ trạng thái hiện tại (sau load_checkpoint hoặc lần chạy trước)
+        thay vì khởi tạo lại; max_iter tính cả các vòng lặp đã chạy.
+        checkpoint: file .npz được ghi sau mỗi checkpoint_interval vòng lặp và khi dừng.
+        """
+        if not resume or not self.started:
+            self.reset()
+        self.stop_reason = None
+        self.deadline = None
+        self.stop_at_lower_bound = stop_at_lower_bound
+        entropy = callback is not None if entropy is None else entropy
+        if time_budget is not None:
+            self.deadline = time.perf_counter() + time_budget
+
+        executor = None
+        if self.n_jobs is not None and self.n_jobs > 1 and not self.batched:
+            executor = ProcessPoolExecutor(max_workers=self.n_jobs)
+        try:
+            while self.stop_reason is None:
+                if self.iteration >= self.max_iter:
+                    self.stop_reason = "max_iter"
+                    break
+                if self.deadline is not None and time.perf_counter() >= self.deadline:
+                    self.stop_reason = "time_budget"
+                    break
+
+                previous_best = self.best_makespan
+                stats = self.iterate(executor, entropy)
+                if callback is not None:
+                    callback(stats)
+
+                self.stale = 0 if self.best_makespan < previous_best else self.stale + 1
+                if self.stop_reason is None and stagnation is not None and self.stale >= stagnation:
+                    self.stop_reason = "stagnation"
+                if checkpoint is not None and self.iteration % checkpoint_interval == 0:
+                    self.save_checkpoint(checkpoint)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        if checkpoint is not None:
+            self.save_checkpoint(checkpoint)
+        return self.best_solution, self.best_makespan
+
+    def save_checkpoint(self, path):
+        """
+        Lưu trạng thái lần chạy vào file .npz nén: pheromone, L đã điều chỉnh bởi dynamic_rule,
+        lời giải tốt nhất, incumbent cắt tỉa, số vòng lặp, bộ đếm cắt tỉa, trạng thái bộ sinh số ngẫu nhiên và thống kê các vòng lặp.
+        """
+        lazy = isinstance(self.tau, LazyPheromone)
+        version, internal, gauss = self.random.getstate()
+        best_solution = self.best_solution if self.best_solution is not None else []
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                shape=np.array([self.N, self.T]),
+                tau=self.tau.data if lazy else self.tau,
+                tau_scale=np.array(self.tau.scale if lazy else 1.0),
+                L=np.array(self.L, dtype=float),
+                best_solution=np.array(best_solution, dtype=int),
+                scores=np.array([self.best_makespan, self.prev_best_makespan, self.incumbent], dtype=float),
+                counters=np.array([self.iteration, self.stale, self.pruned_ants, self.complete_builds],
+                                  dtype=np.int64),
+                prune_times=np.array([self.pruned_time_saved, self.complete_build_time]),
+                base_seed=np.array(-1 if self.base_seed is None else self.base_seed, dtype=np.int64),
+                rng_state=np.array(internal, dtype=np.int64),
+                rng_extra=np.array([version, np.nan if gauss is None else gauss]),
+                history=np.array(json.dumps(self.history)),
+            )
+
+    def load_checkpoint(self, path, warm_start=False):
+        """
+        Nạp trạng thái đã lưu bằng save_checkpoint.
+        warm_start=False: khôi phục toàn bộ để run(resume=True) chạy tiếp đúng như chưa bị dừng
+        (cùng N và T với lần chạy đã lưu); trạng thái lần chạy được reset trước rồi ghi đè bằng phần đã lưu.
+        warm_start=True: chỉ lấy pheromone và L cho một bài toán tương tự (cùng N, T có thể khác):
+        các hàng thời gian thiếu được khởi tạo như ban đầu, L_j không nhỏ hơn giá trị tĩnh của bài toán mới.
+        """
+        with np.load(path) as data:
+            N, T = (int(v) for v in data["shape"])
+            if N != self.N or (not warm_start and T != self.T):
+                raise ValueError(f"Checkpoint cho N={N}, T={T} không khớp với N={self.N}, T={self.T}")
+            tau, scale = data["tau"], float(data["tau_scale"])
+            L = [int(v) if np.isfinite(v) else float(v) for v in data["L"]]
+
+            if warm_start:
+                values = np.full((self.T, N + 2), 0.1)
+                rows = min(T, self.T)
+                values[:rows] = tau[:rows] * scale
+                self.tau[:, :] = values
+                self.L = [max(old, new) for old, new in zip(L, self.static_L)]
+                self.eta_beta = self.eta_columns(range(N + 2))
+                return
+
+            self.reset()
+            if isinstance(self.tau, LazyPheromone):
+                self.tau.data[...] = tau
+                self.tau.scale = scale
+            else:
+                self.tau[...] = tau * scale
+            self.L = L
+            self.eta_beta = self.eta_columns(range(N + 2))
+
+            best_solution = [int(v) for v in data["best_solution"]]
+            self.best_solution = best_solution if best_solution else None
+            scores = [int(v) if np.isfinite(v) else float(v) for v in data["scores"]]
+            self.best_makespan, self.prev_best_makespan = scores[:2]
+            if len(scores) == 3:  # Checkpoint có incumbent cho cắt tỉa
+                self.incumbent = scores[2]
+            elif self.best_solution is not None:
+                self.offer_incumbent(self.best_solution, self.best_makespan)
+            counters = [int(v) for v in data["counters"]]
+            self.iteration, self.stale = counters[:2]
+            if len(counters) == 4:  # Checkpoint có bộ đếm cắt tỉa (prune=True)
+                self.pruned_ants, self.complete_builds = counters[2:]
+                self.pruned_time_saved, self.complete_build_time = (float(v) for v in data["prune_times"])
+            base_seed = int(data["base_seed"])
+            self.base_seed = None if base_seed == -1 else base_seed
+            version, gauss = data["rng_extra"]
+            self.random.setstate((int(version), tuple(int(v) for v in data["rng_state"]),
+                                  None if np.isnan(gauss) else float(gauss)))
+            self.history = json.loads(str(data["history"]))
+        self.stop_reason = None
+        self.deadline = None
+        self.stop_at_lower_bound = False
+
+    def apply_changes(self, events, T=None):
+        """
+        Áp dụng các thay đổi của dự án cho bộ giải đang chạy, giữ lại pheromone đã học.
+        events: danh sách dict theo thứ tự áp dụng, chỉ số hoạt động theo cách đánh số hiện tại:
+            {"type": "duration", "activity": j, "value": p_j}
+            {"type": "demand", "activity": j, "value": [r_j1, ..., r_jK]}
+            {"type": "capacity", "resource": k, "value": R_k}
+            {"type": "precedence", "before": i, "after": j}
+            {"type": "activity", "duration": p, "demand": [...], "predecessors": [...], "successors": [...]}
+        Hoạt động mới được chèn trước hoạt động kết thúc. Nếu thứ tự chỉ số không còn là thứ tự tô-pô,
+        các hoạt động được đánh số lại (ổn định) và cột pheromone được ánh xạ theo.
+        E chỉ được tính lại cho các hậu duệ của phần thay đổi; L của mọi tổ tiên (kể cả hoạt động bắt đầu)
+        lấy giá trị tĩnh của dự án mới, các hoạt động khác giữ L đã được quy tắc động điều chỉnh.
+        eta^beta chỉ được tính lại cho các cột thay đổi.
+        T: thời gian tối đa mới; mặc định tăng thêm phần thời gian thực hiện tăng lên và của hoạt động mới,
+        và không nhỏ hơn makespan của lời giải đã sửa (hoặc của lịch tuần tự khi chưa chạy).
+        Lời giải tốt nhất cũ được sửa thành lời giải khả thi của dự án mới (repair_schedule) để
+        run(resume=True) tiếp tục tối ưu từ đó; ValueError nếu lời giải đã sửa không vừa trong T đã cho.
+        Trả về ánh xạ chỉ số cũ -> chỉ số mới.
+        """
+        N = self.N
+        p = list(self.p)
+        r = [list(row) for row in self.r]
+        R = list(self.R)
+        predecessors = [list(row) for row in self.predecessors]
+        successors = [list(row) for row in self.successors]
+        E, L, static_L = list(self.E), list(self.L), list(self.static_L)
+        mapping = list(range(N + 2))  # Chỉ số gốc -> chỉ số hiện tại
+        dirty_E, dirty_L, touched = set(), set(), set()
+        added_time = 0
+        renumber = False
+
+        for event in events:
+            kind = event["type"]
+            if kind == "duration":
+                j = event["activity"]
+                added_time += max(0, event["value"] - p[j])
+                p[j] = event["value"]
+                dirty_E.update(successors[j])
+                dirty_L.add(j)
+                touched.add(j)
+            elif kind == "demand":
+                r[event["activity"]] = list(event["value"])
+            elif kind == "capacity":
+                R[event["resource"]] = event["value"]
+            elif kind == "precedence":
+                i, j = event["before"], event["after"]
+                if j not in successors[i]:
+                    successors[i].append(j)
+                    predecessors[j].append(i)
+                    dirty_E.add(j)
+                    dirty_L.add(i)
+                    renumber = renumber or i > j
+            elif kind == "activity":
+                # Chèn hoạt động mới tại chỉ số N + 1, hoạt động kết thúc dời sang N + 2
+                new, end = N + 1, N + 2
+                for row in predecessors + successors:
+                    row[:] = [end if v == new else v for v in row]
+                mapping = [end if v == new else v for v in mapping]
+                dirty_E, dirty_L, touched = ({end if v == new else v for v in values}
+                                             for values in (dirty_E, dirty_L, touched))
+                p.insert(new, event["duration"])
+                r.insert(new, list(event["demand"]))
+                E.insert(new, 0)
+                L.insert(new, 0)
+                static_L.insert(new, 0)
+                predecessors.insert(new, [])
+                successors.insert(new, [])
+                for i in event.get("predecessors") or [0]:
+                    successors[i].append(new)
+                    predecessors[new].append(i)
+                for j in event.get("successors") or [end]:
+                    j = end if j == new else j
+                    predecessors[j].append(new)
+                    successors[new].append(j)
+                    renumber = renumber or j < new
+                dirty_E.update({new} | set(successors[new]))
+                dirty_L.update({new} | set(predecessors[new]))
+                touched.add(new)
+                added_time += event["duration"]
+                N += 1
+            else:
+                raise ValueError(f"Loại thay đổi không hợp lệ: {kind}")
+
+        # Đánh số lại theo thứ tự tô-pô, ưu tiên giữ nguyên thứ tự chỉ số hiện có
+        order = list(range(N + 2))
+        if renumber:
+            indegree = [len(predecessors[j]) for j in range(N + 2)]
+            heap = [j for j in range(N + 2) if indegree[j] == 0]
+            order = []
+            while heap:
+                i = heapq.heappop(heap)
+                order.append(i)
+                for j in successors[i]:
+                    indegree[j] -= 1
+                    if indegree[j] == 0:
+                        heapq.heappush(heap, j)
+            if len(order) != N + 2:
+                raise ValueError("Quan hệ phụ thuộc mới tạo thành chu trình")
+            position = [0] * (N + 2)
+            for new_index, old_index in enumerate(order):
+                position[old_index] = new_index
+            p, r, E, L, static_L = ([values[i] for i in order] for values in (p, r, E, L, static_L))
+            predecessors = [[position[v] for v in predecessors[i]] for i in order]
+            successors = [[position[v] for v in successors[i]] for i in order]
+            mapping = [position[v] for v in mapping]
+            dirty_E, dirty_L, touched = ({position[v] for v in values} for values in (dirty_E, dirty_L, touched))
+
+        # E theo chiều tiến cho các hậu duệ, L theo chiều lùi cho các tổ tiên (cùng công thức calculate_E_L)
+        changed = set(touched)
+        heap = sorted(dirty_E)
+        queued = set(heap)
+        while heap:
+            j = heapq.heappop(heap)
+            if not 1 <= j <= N:
+                continue
+            value = max((E[i] + p[i] for i in predecessors[j]), default=0)
+            if value != E[j] or j in touched:
+                E[j] = value
+                changed.add(j)
+                for i in successors[j]:
+                    if i not in queued:
+                        queued.add(i)
+                        heapq.heappush(heap, i)
+                if not successors[j]:
+                    dirty_L.add(j)
+        # L tĩnh chỉ thay đổi ở các tổ tiên của các hoạt động thay đổi (kể cả hoạt động bắt đầu):
+        # tính lại theo thứ tự chỉ số giảm dần từ L tĩnh của các hoạt động sau, các hoạt động khác giữ
+        # L tĩnh cũ. L của tổ tiên lấy giá trị tĩnh mới, bỏ điều chỉnh của quy tắc động; các hoạt động
+        # khác giữ L đã điều chỉnh
+        if dirty_L:
+            stack, ancestors = list(dirty_L), set(dirty_L)
+            while stack:
+                for i in predecessors[stack.pop()]:
+                    if i not in ancestors:
+                        ancestors.add(i)
+                        stack.append(i)
+            for j in sorted(ancestors, reverse=True):
+                if not 0 <= j <= N:
+                    continue
+                if successors[j]:
+                    static_L[j] = min(static_L[i] - p[j] for i in successors[j])
                 else:
-                    makespan = max(solution[j] + self.p[j] for j in range(1, self.N + 1) if solution[j] != -1)
-                print(f"Solution: {solution}")
-                print(f"Makespan: {makespan}")
-                solutions.append((solution, makespan))
-                if makespan < best_makespan:
-                    best_makespan = makespan
-                    best_solution = solution
+                    static_L[j] = E[j] + p[j]
+                if static_L[j] != L[j] or j in touched:
+                    L[j] = static_L[j]
+                    changed.add(j)
+
+        demand = np.array(r).reshape(N + 2, len(R))
+        if np.any(demand > np.array(R)):
+            raise ValueError("Yêu cầu tài nguyên của một hoạt động vượt quá giới hạn tài nguyên")
+
+        # Lời giải tốt nhất cũ theo cách đánh số mới
+        old_solution = self.best_solution if self.started else None
+        if old_solution is not None:
+            solution = [-1] * (N + 2)
+            for old_index, new_index in enumerate(mapping):
+                solution[new_index] = old_solution[old_index]
+            old_solution = solution
+
+        # Cập nhật dự án với thời gian tối đa tạm đủ cho mọi lịch tuần tự để sửa lời giải cũ;
+        # trạng thái cũ được khôi phục nếu lời giải cũ không vừa trong T đã cho
+        previous = self.__dict__.copy()
+        old_T, old_tau = self.T, self.tau
+        self.N, self.T = N, sum(p) + 1
+        self.p, self.r, self.R = p, r, R
+        self.predecessors, self.successors = predecessors, successors
+        self.E, self.L, self.static_L = E, L, static_L
+        self.durations = np.array(p)
+        self.capacity = np.array(R)
+        self.demand = demand
+        self.problem = None  # Dự án đã thay đổi, không còn dùng chung Problem
+        self.build_adjacency()
+        repaired = self.repair_schedule(old_solution) if old_solution is not None else None
+        if T is None:
+            # Cung mới có thể kéo dài lịch hơn phần thời gian tăng thêm: T không nhỏ hơn makespan
+            # của lời giải đã sửa, hoặc của lịch tuần tự (serial SGS) khi chưa có lời giải
+            schedule = repaired if repaired is not None else self.repair_schedule([-1] * (N + 2))
+            T = max(old_T + added_time, schedule[N + 1])
+        elif repaired is not None and repaired[N + 1] > T:
+            self.__dict__.update(previous)
+            raise ValueError(f"Lời giải tốt nhất sau khi sửa có makespan {repaired[N + 1]} vượt quá T={T}")
+        self.T = T
+
+        # Pheromone: ánh xạ cột theo chỉ số mới, thêm/bớt hàng thời gian; ô mới nhận giá trị ban đầu
+        columns = np.array(mapping)
+        rows = min(old_T, T)
+        if isinstance(old_tau, LazyPheromone):
+            tau = LazyPheromone((T, N + 2), 0.1 / old_tau.scale, dtype=old_tau.dtype)
+            tau.scale = old_tau.scale
+            tau.data[:rows, columns] = old_tau.data[:rows]
+        else:
+            tau = np.full((T, N + 2), 0.1, dtype=old_tau.dtype)
+            tau[:rows, columns] = old_tau[:rows]
+        self.tau = tau
+        if renumber or T != old_T or len(mapping) != N + 2:
+            self.eta_beta = self.eta_columns(range(N + 2))
+        elif changed:
+            changed = sorted(changed)
+            self.eta_beta[:, changed] = self.eta_columns(changed)
+        self.lower_bound = compute_lower_bound(predecessors, p, R, r, N)
+
+        # Lời giải đã sửa là lời giải khả thi của dự án mới, tiếp tục tối ưu từ đó
+        if self.started:
+            self.best_solution, self.best_makespan = None, float('inf')
+            if repaired is not None:
+                self.best_solution, self.best_makespan = repaired, repaired[N + 1]
+            self.prev_best_makespan = self.best_makespan
+            self.incumbent = self.best_makespan  # Lời giải đã sửa là lịch đầy đủ, khả thi
+            self.iteration = 0
+            self.stale = 0
+            self.history = []
+        return mapping
+
+    def repair_schedule(self, solution):
+        """
+        Serial SGS theo thứ tự thời điểm bắt đầu của solution (hoạt động chưa có thời điểm xếp theo E_j):
+        mỗi hoạt động bắt đầu sớm nhất sau các hoạt động trước và đủ tài nguyên.
+        Cho lời giải khả thi gần với solution; hoạt động không vừa trong T giữ -1.
+        """
+        priority = [(solution[j] if solution[j] != -1 else self.E[j], j) for j in range(self.N + 2)]
+        remaining = [len(self.predecessors[j]) for j in range(self.N + 2)]
+        ready = [priority[j] for j in range(self.N + 2) if remaining[j] == 0]
+        heapq.heapify(ready)
+        start = [-1] * (self.N + 2)
+        usage = np.zeros((self.T, len(self.R)), dtype=self.demand.dtype)
+        while ready:
+            _, j = heapq.heappop(ready)
+            earliest = max((start[i] + self.p[i] for i in self.predecessors[j]), default=0)
+            starts = self.feasible_starts(usage, j, earliest, self.T)
+            if not len(starts):
+                break
+            start[j] = int(starts[0])
+            usage[start[j]:start[j] + self.p[j]] += self.demand[j]
+            for i in self.released_by[j]:
+                remaining[i] -= 1
+                if remaining[i] == 0:
+                    heapq.heappush(ready, priority[i])
+        return start
 
-            # Cập nhật pheromone toàn cục
-            self.global_update(best_solution, best_makespan, prev_best_makespan)
-            prev_best_makespan = best_makespan
+# Mô hình đảo: nhiều đàn kiến độc lập trao đổi thông tin định kỳ
+class MultiColonyDDACS:
+    def __init__(self, colonies, interval=10, topology="ring", migration=0.1, seed=None, n_jobs=None):
+        # Danh sách DDACS, mỗi đàn có tau, L và bộ tham số riêng. Các đàn được sao chép (dùng chung Problem)
+        # nên seed, n_jobs, random và trạng thái lần chạy của các đàn truyền vào không bị thay đổi
+        self.colonies = [copy.deepcopy(colony, {id(colony.problem): colony.problem}) for colony in colonies]
+        self.interval = interval  # Số vòng lặp giữa hai lần trao đổi
+        self.topology = topology  # "ring" hoặc "full"
+        self.migration = migration  # Tỷ lệ pha trộn pheromone từ các đàn lân cận
+        self.n_jobs = n_jobs if n_jobs is not None else len(colonies)  # Số tiến trình
+        self.colony_curves = [[] for _ in colonies]  # (thời gian, makespan tốt nhất) của từng đàn
+        self.global_curve = []  # (thời gian, makespan tốt nhất toàn cục)
+        self.best_solution = None
+        self.best_makespan = float('inf')
 
-            # Áp dụng quy tắc động
-            self.dynamic_rule(best_solution)
+        # Mỗi đàn cần nguồn ngẫu nhiên riêng để các tiến trình không lặp lại cùng một chuỗi
+        for k, colony in enumerate(self.colonies):
+            if colony.seed is None:
+                colony_seed = np.random.SeedSequence([seed if seed is not None else random.getrandbits(32), k])
+                colony.seed = int(colony_seed.generate_state(1)[0])
+                colony.random = random.Random(colony.seed)
+            colony.n_jobs = None if colony.n_jobs is None else 1  # Không tạo tiến trình lồng nhau
 
-        return best_solution, best_makespan
+    def neighbors(self, k):
+        """Các đàn lân cận của đàn k theo topology"""
+        n = len(self.colonies)
+        if self.topology == "full":
+            return [i for i in range(n) if i != k]
+        return sorted({(k - 1) % n, (k + 1) % n} - {k})
+
+    def exchange(self):
+        """
+        Trao đổi lời giải tốt nhất và pha trộn pheromone giữa các đàn lân cận.
+        Đàn nhận lời giải tốt hơn chỉ thay lời giải tốt nhất; cập nhật pheromone toàn cục và quy tắc động
+        cho lời giải đó diễn ra ở vòng lặp kế tiếp của đàn như thường lệ.
+        """
+        taus = [np.array(colony.tau) for colony in self.colonies]
+        bests = [(colony.best_makespan, colony.best_solution) for colony in self.colonies]
+        for k, colony in enumerate(self.colonies):
+            neighbors = self.neighbors(k)
+            if not neighbors:
+                continue
+            colony.tau *= (1 - self.migration)
+            colony.tau += self.migration * np.mean([taus[i] for i in neighbors], axis=0)
+
+            makespan, solution = min((bests[i] for i in neighbors), key=lambda x: x[0])
+            if solution is not None and makespan < colony.best_makespan:
+                colony.prev_best_makespan = colony.best_makespan
+                colony.best_makespan = makespan
+                colony.best_solution = list(solution)
+                colony.offer_incumbent(colony.best_solution, makespan)
+
+    def run(self, epochs=None, time_budget=None):
+        """
+        Chạy các đàn song song theo từng chặng interval vòng lặp, trao đổi sau mỗi chặng.
+        Dừng sau epochs chặng hoặc khi hết time_budget giây (mặc định: max_iter của đàn đầu tiên);
+        thời gian còn lại được truyền cho từng đàn để đàn dừng ngay giữa chặng.
+        """
+        if epochs is None and time_budget is None:
+            epochs = -(-self.colonies[0].max_iter // self.interval)
+        for colony in self.colonies:
+            colony.reset()
+
+        start = time.perf_counter()
+        epoch = 0
+        with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+            while epochs is None or epoch < epochs:
+                if time_budget is not None and time.perf_counter() - start >= time_budget:
+                    break
+                epoch_start = time.perf_counter() - start
+                remaining = None if time_budget is None else time_budget - epoch_start
+                n = len(self.colonies)
+                results = list(executor.map(_run_colony, self.colonies, [self.interval] * n, [remaining] * n))
+                self.colonies = [colony for colony, _ in results]
+                for k, (_, curve) in enumerate(results):
+                    self.colony_curves[k].extend((epoch_start + elapsed, makespan) for elapsed, makespan in curve)
+
+                for colony in self.colonies:
+                    if colony.best_makespan < self.best_makespan:
+                        self.best_makespan = colony.best_makespan
+                        self.best_solution = list(colony.best_solution)
+                self.global_curve.append((time.perf_counter() - start, self.best_makespan))
+
+                self.exchange()
+                epoch += 1
+
+        return self.best_solution, self.best_makespan
 
 # Ví dụ sử dụng
 if __name__ == "__main__":
@@ -274,7 +1864,13 @@ if __name__ == "__main__":
         []  # 11: No successors
     ]
 
+    def report(stats):
+        print(f"Iteration {stats['iteration']}: best={stats['best_makespan']} "
+              f"mean={stats['mean_makespan']:.2f} worst={stats['worst_makespan']} "
+              f"incomplete={stats['incomplete_ratio']:.0%} entropy={stats['entropy']:.3f}")
+
     ddacs = DDACS(N, T, c, c1, ant, alpha, beta, rho, delta, q0, q1, max_iter, p, R, r, predecessors, successors)
-    best_solution, best_makespan = ddacs.run()
+    best_solution, best_makespan = ddacs.run(callback=report)
     print(f"Best solution: {best_solution}")
     print(f"Makespan: {best_makespan}")
+    print(f"Stopped by: {ddacs.stop_reason} (lower bound {ddacs.lower_bound})")
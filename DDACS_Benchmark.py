@@ -0,0 +1,195 @@
+"""
+Đo chất lượng và tốc độ của DDACS trên bộ dữ liệu PSPLIB (J30/J60/J120)
+
+Author: Phạm Lê Ngọc Sơn
+
+Ví dụ:
+    python DDACS_Benchmark.py data/j30 --seeds 0 1 2 --max-iter 50 --output j30.json
+    python DDACS_Benchmark.py data/j30 --seeds 0 1 2 --output new.json --compare j30.json
+    python DDACS_Benchmark.py --generate 30 120 1000 --count 5 --event-driven --output scaling.json
+"""
+
+import argparse
+import json
+import platform
+import time
+
+import numpy as np
+
+from DDACS_Algorithm import DDACS, Problem, critical_path_length
+from DDACS_Instances import load_directory, generate
+
+# Tham số mặc định, giống ví dụ trong DDACS_Algorithm.py
+DEFAULT_PARAMS = {
+    "c": 10,
+    "c1": 50,
+    "ant": 10,
+    "alpha": 1,
+    "beta": 1,
+    "rho": 0.1,
+    "delta": 0.1,
+    "q0": 0.9,
+    "q1": 0.95,
+    "max_iter": 50,
+}
+
+def make_solver(instance, seed=None, params=None, **options):
+    """Tạo DDACS cho một bài toán; params ghi đè DEFAULT_PARAMS, options chuyển thẳng cho DDACS"""
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    return DDACS.from_problem(Problem.from_instance(instance), instance["T"], params["c"], params["c1"],
+                              params["ant"], params["alpha"], params["beta"], params["rho"], params["delta"],
+                              params["q0"], params["q1"], params["max_iter"], seed=seed, **options)
+
+def run_instance(instance, seed, params=None, time_budget=None, **options):
+    """Chạy DDACS một lần với seed cố định, trả về một dòng kết quả"""
+    solver = make_solver(instance, seed, params, **options)
+    start = time.perf_counter()
+    solution, makespan = solver.run(time_budget=time_budget)
+    wall_time = time.perf_counter() - start
+
+    N = instance["N"]
+    critical_path = critical_path_length(instance["predecessors"], instance["p"], N)
+    if solution is None:  # validate=True và không kiến nào tìm được lời giải khả thi
+        report = {"complete": False, "feasible": False}
+    else:
+        report = solver.validate_schedules(solution, details=False)
+    return {
+        "instance": instance["name"],
+        "N": N,
+        "seed": seed,
+        "makespan": makespan if solution is None else int(makespan),
+        "critical_path": critical_path,
+        "lower_bound": solver.lower_bound,
+        "gap": (makespan - critical_path) / critical_path if critical_path > 0 else 0.0,
+        "complete": report["complete"],
+        "feasible": report["feasible"],
+        "iterations": solver.iteration,
+        "wall_time": wall_time,
+        "iterations_per_second": solver.iteration / wall_time if wall_time > 0 else 0.0,
+        "stop_reason": solver.stop_reason,
+    }
+
+def summarize(results):
+    """Thống kê chung của các dòng kết quả"""
+    if not results:
+        return {}
+    return {
+        "runs": len(results),
+        "instances": len({row["instance"] for row in results}),
+        "mean_gap": sum(row["gap"] for row in results) / len(results),
+        "max_gap": max(row["gap"] for row in results),
+        "incomplete": sum(not row["complete"] for row in results),
+        "infeasible": sum(not row["feasible"] for row in results),
+        "total_wall_time": sum(row["wall_time"] for row in results),
+        "mean_iterations_per_second": sum(row["iterations_per_second"] for row in results) / len(results),
+    }
+
+def run_benchmark(instances, seeds=(0,), params=None, time_budget=None, callback=None, **options):
+    """
+    Chạy mọi bài toán với mọi seed. Trả về báo cáo dạng dict (ghi được ra JSON) gồm
+    meta (tham số, phiên bản), results (một dòng cho mỗi lần chạy) và summary.
+    callback: hàm nhận mỗi dòng kết quả ngay khi chạy xong.
+    """
+    results = []
+    for instance in instances:
+        for seed in seeds:
+            row = run_instance(instance, seed, params, time_budget, **options)
+            results.append(row)
+            if callback is not None:
+                callback(row)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "params": {**DEFAULT_PARAMS, **(params or {})},
+            "options": options,
+            "seeds": list(seeds),
+            "time_budget": time_budget,
+        },
+        "results": results,
+        "summary": summarize(results),
+    }
+
+def compare(baseline, current):
+    """
+    So sánh hai báo cáo theo từng bài toán (trung bình trên các seed):
+    chênh lệch makespan (âm là tốt hơn) và tỷ lệ tốc độ vòng lặp (current / baseline).
+    """
+    def by_instance(report):
+        groups = {}
+        for row in report["results"]:
+            groups.setdefault(row["instance"], []).append(row)
+        return {name: (sum(row["makespan"] for row in rows) / len(rows),
+                       sum(row["iterations_per_second"] for row in rows) / len(rows))
+                for name, rows in groups.items()}
+
+    old, new = by_instance(baseline), by_instance(current)
+    rows = []
+    for name in new:
+        if name not in old:
+            continue
+        (old_makespan, old_speed), (new_makespan, new_speed) = old[name], new[name]
+        rows.append({
+            "instance": name,
+            "makespan_delta": new_makespan - old_makespan,
+            "speedup": new_speed / old_speed if old_speed > 0 else float("inf"),
+        })
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark DDACS trên bộ dữ liệu PSPLIB (.sm), Patterson (.rcp) hoặc bài toán sinh ngẫu nhiên")
+    parser.add_argument("directory", nargs="?", help="Thư mục chứa các file .sm/.rcp")
+    parser.add_argument("--generate", type=int, nargs="+", default=[],
+                        help="Sinh ngẫu nhiên bài toán với các số hoạt động này (xem DDACS_Instances.generate)")
+    parser.add_argument("--count", type=int, default=1, help="Số bài toán sinh cho mỗi kích thước")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--limit", type=int, default=None, help="Chỉ chạy limit bài toán đầu tiên")
+    parser.add_argument("--max-iter", type=int, default=DEFAULT_PARAMS["max_iter"])
+    parser.add_argument("--ant", type=int, default=DEFAULT_PARAMS["ant"])
+    parser.add_argument("--time-budget", type=float, default=None, help="Số giây tối đa cho mỗi lần chạy")
+    parser.add_argument("--event-driven", action="store_true")
+    parser.add_argument("--improve", action="store_true")
+    parser.add_argument("--batched", action="store_true", help="Xây dựng mọi kiến cùng lúc trên mảng")
+    parser.add_argument("--output", default=None, help="File JSON ghi báo cáo")
+    parser.add_argument("--compare", default=None, help="Báo cáo JSON cũ để so sánh")
+    args = parser.parse_args(argv)
+
+    if args.directory is None and not args.generate:
+        parser.error("cần thư mục dữ liệu hoặc --generate")
+    instances = load_directory(args.directory) if args.directory is not None else []
+    instances += [generate(size, seed=k) for size in args.generate for k in range(args.count)]
+    instances = instances[:args.limit]
+    params = {"max_iter": args.max_iter, "ant": args.ant}
+    options = {}
+    if args.event_driven:
+        options["event_driven"] = True
+    if args.improve:
+        options["improve"] = True
+    if args.batched:
+        options["batched"] = True
+
+    def report(row):
+        print(f"{row['instance']} seed={row['seed']}: makespan={row['makespan']} cp={row['critical_path']} "
+              f"gap={row['gap']:.1%} it/s={row['iterations_per_second']:.1f}"
+              + ("" if row["feasible"] else " (infeasible)"))
+
+    result = run_benchmark(instances, args.seeds, params, args.time_budget, callback=report, **options)
+    summary = result["summary"]
+    if summary:
+        print(f"{summary['runs']} runs: mean gap {summary['mean_gap']:.1%}, "
+              f"{summary['mean_iterations_per_second']:.1f} it/s, {summary['total_wall_time']:.1f} s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for row in compare(baseline, result):
+            print(f"{row['instance']}: makespan {row['makespan_delta']:+.2f}, speed x{row['speedup']:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Đọc bộ dữ liệu RCPSP cho thuật toán DDACS
+
+Author: Phạm Lê Ngọc Sơn
+"""
+
+import os
+import re
+
+import numpy as np
+
+# Một bài toán được biểu diễn bằng dict với các khóa:
+#   name, N, T, p, R, r, predecessors, successors
+# theo đúng quy ước của DDACS: hoạt động 0 và N + 1 là dummy, T là thời gian tối đa.
+
+def make_instance(name, p, R, r, successors, T=None):
+    """Tạo bài toán từ danh sách hoạt động sau; predecessors được suy ra từ successors"""
+    N = len(p) - 2
+    predecessors = [[] for _ in range(N + 2)]
+    for i in range(N + 2):
+        for j in successors[i]:
+            predecessors[j].append(i)
+    if T is None:
+        T = sum(p)  # Lên lịch tuần tự luôn vừa trong tổng thời gian thực hiện
+    return {
+        "name": name,
+        "N": N,
+        "T": T,
+        "p": list(p),
+        "R": list(R),
+        "r": [list(row) for row in r],
+        "predecessors": predecessors,
+        "successors": [sorted(row) for row in successors],
+    }
+
+def load_sm(path):
+    """
+    Đọc file PSPLIB định dạng .sm (J30/J60/J120, một mode).
+    Hoạt động được đánh số lại từ 0 (supersource) tới N + 1 (supersink), T lấy từ dòng horizon.
+    """
+    with open(path, encoding="utf-8", errors="replace") as f:
+        lines = [line.strip() for line in f]
+
+    horizon = None
+    successors, p, r, R = {}, {}, {}, []
+    section = None
+    for line in lines:
+        if not line or line.startswith("*") or line.startswith("-"):
+            continue
+        lower = line.lower()
+        if lower.startswith("horizon"):
+            horizon = int(line.split(":")[1])
+        elif lower.startswith("precedence relations"):
+            section = "precedence"
+        elif lower.startswith("requests/durations"):
+            section = "requests"
+        elif lower.startswith("resourceavailabilities"):
+            section = "resources"
+        elif lower.startswith("pronr.") or lower.startswith("project information"):
+            section = None
+        elif section is not None and line[0].isdigit():
+            values = [int(v) for v in line.split()]
+            if section == "precedence":
+                # jobnr. #modes #successors successors...
+                successors[values[0] - 1] = [v - 1 for v in values[3:3 + values[2]]]
+            elif section == "requests":
+                # jobnr. mode duration R1 R2 ...
+                p[values[0] - 1] = values[2]
+                r[values[0] - 1] = values[3:]
+            else:
+                R = values
+                section = None
+
+    if not successors or len(p) != len(successors) or not R:
+        raise ValueError(f"Không đọc được file .sm: {path}")
+    jobs = range(len(p))
+    name = os.path.splitext(os.path.basename(path))[0]
+    return make_instance(name, [p[j] for j in jobs], R, [r[j] for j in jobs],
+                         [successors[j] for j in jobs], T=horizon)
+
+def load_patterson(path, T=None):
+    """
+    Đọc file định dạng Patterson (.rcp): dòng đầu "số hoạt động, số tài nguyên", dòng hai là giới hạn
+    tài nguyên, sau đó mỗi hoạt động "thời gian, yêu cầu tài nguyên..., số hoạt động sau, hoạt động sau...".
+    Danh sách hoạt động sau có thể xuống dòng nên file được đọc như một dãy số.
+    """
+    with open(path, encoding="utf-8", errors="replace") as f:
+        values = [int(v) for v in f.read().split()]
+    try:
+        jobs, K = values[0], values[1]
+        R = values[2:2 + K]
+        position = 2 + K
+        p, r, successors = [], [], []
+        for _ in range(jobs):
+            p.append(values[position])
+            r.append(values[position + 1:position + 1 + K])
+            count = values[position + 1 + K]
+            successors.append([v - 1 for v in values[position + 2 + K:position + 2 + K + count]])
+            position += 2 + K + count
+    except IndexError:
+        raise ValueError(f"Không đọc được file Patterson: {path}") from None
+    name = os.path.splitext(os.path.basename(path))[0]
+    return make_instance(name, p, R, r, successors, T=T)
+
+def load(path):
+    """Đọc một bài toán, chọn định dạng theo phần mở rộng (.sm là PSPLIB, còn lại là Patterson)"""
+    if path.lower().endswith(".sm"):
+        return load_sm(path)
+    return load_patterson(path)
+
+def load_directory(directory, extension=(".sm", ".rcp")):
+    """Đọc mọi bài toán có phần mở rộng extension trong thư mục, sắp xếp theo tên file (j301_1, j301_2, ...)"""
+    def key(filename):
+        # Sắp xếp tự nhiên: j301_2 đứng trước j301_10
+        parts = re.split(r"(\d+)", os.path.splitext(filename)[0])
+        return [int(part) if i % 2 else part for i, part in enumerate(parts)]
+
+    filenames = sorted((f for f in os.listdir(directory) if f.lower().endswith(extension)), key=key)
+    return [load(os.path.join(directory, f)) for f in filenames]
+
+def _reaches(successors, source, target):
+    """Có đường đi từ source tới target không (các cung luôn đi từ chỉ số nhỏ tới chỉ số lớn)"""
+    stack, seen = [source], {source}
+    while stack:
+        i = stack.pop()
+        for j in successors[i]:
+            if j == target:
+                return True
+            if j < target and j not in seen:
+                seen.add(j)
+                stack.append(j)
+    return False
+
+def _reachable(adjacency, source, low, high):
+    """Các hoạt động đi tới được từ source (tính cả source) qua các hoạt động có chỉ số trong [low, high]"""
+    stack, seen = [source], {source}
+    while stack:
+        i = stack.pop()
+        for j in adjacency[i]:
+            if low <= j <= high and j not in seen:
+                seen.add(j)
+                stack.append(j)
+    return seen
+
+def _serial_makespan(p, r, R, predecessors):
+    """Makespan của lịch tuần tự (serial SGS) theo thứ tự chỉ số, luôn khả thi nên dùng làm thời gian tối đa"""
+    capacity = np.array(R)
+    usage = np.zeros((sum(p) + 1, len(R)), dtype=int)
+    finish = [0] * len(p)
+    frontier = 0  # Sau frontier chưa có hoạt động nào, chỉ cần dò tới đó
+    for j in range(len(p)):
+        start = max((finish[i] for i in predecessors[j]), default=0)
+        if p[j] > 0:
+            fits = np.all(usage[start:max(start, frontier) + p[j]] + r[j] <= capacity, axis=1).astype(int)
+            # Vị trí đầu tiên có p_j thời điểm liên tiếp đủ tài nguyên
+            run = np.convolve(fits, np.ones(p[j], dtype=int), mode="valid")
+            start += int(np.argmax(run == p[j]))
+            usage[start:start + p[j]] += r[j]
+        finish[j] = start + p[j]
+        frontier = max(frontier, finish[j])
+    return frontier
+
+def generate(N, K=4, nc=1.5, rf=0.5, rs=0.2, max_duration=10, max_demand=10, window=None, slack=0.25,
+             seed=None, name=None):
+    """
+    Sinh ngẫu nhiên một bài toán RCPSP với N hoạt động thực, K tài nguyên (cùng seed cho cùng bài toán).
+    nc: độ phức tạp mạng, số cung trung bình trên mỗi hoạt động (tính cả cung từ/tới dummy);
+        cung được thêm không lặp lại đường đi đã có từ i tới j.
+    rf: hệ số tài nguyên, tỷ lệ tài nguyên trung bình mà một hoạt động sử dụng.
+    rs: độ mạnh tài nguyên, R_k = rmin_k + rs * (rmax_k - rmin_k) với rmin_k là yêu cầu lớn nhất
+        và rmax_k là đỉnh sử dụng của lịch bắt đầu sớm nhất.
+    window: cung chỉ nối các hoạt động cách nhau tối đa window chỉ số (giữ việc sinh nhanh khi N lớn).
+    T là makespan của lịch tuần tự cộng thêm slack phần.
+    """
+    rng = np.random.default_rng(seed)
+    window = window if window is not None else max(10, N // 10)
+    successors = [[] for _ in range(N + 2)]
+    predecessors = [[] for _ in range(N + 2)]
+    predecessor_count = [0] * (N + 2)
+
+    def add_arc(i, j):
+        successors[i].append(j)
+        predecessors[j].append(i)
+        predecessor_count[j] += 1
+
+    def redundant(i, j):
+        """
+        Cung i -> j thừa (j đã đi tới được từ i) hoặc làm thừa một cung a -> b đã có (a đi tới được i,
+        j đi tới được b). Cung nối hai hoạt động cách nhau tối đa window chỉ số, nên chỉ cần xét
+        tổ tiên a >= j - window của i và hậu duệ b <= i + window của j.
+        """
+        if j in successors[i] or _reaches(successors, i, j):
+            return True
+        ancestors = _reachable(predecessors, i, j - window, i)
+        descendants = _reachable(successors, j, j, i + window)
+        return any(b in descendants for a in ancestors for b in successors[a])
+
+    # Cung giữa các hoạt động thực: phần lớn hoạt động có một hoạt động trước gần đó,
+    # hoạt động chưa có hoạt động sau được nối tới một hoạt động phía sau
+    for j in range(2, N + 1):
+        if rng.random() < 0.8:
+            add_arc(int(rng.integers(max(1, j - window), j)), j)
+    for i in range(1, N):
+        if not successors[i] and rng.random() < 0.5:
+            j = int(rng.integers(i + 1, min(N, i + window) + 1))
+            if not redundant(i, j):
+                add_arc(i, j)
+    # Cung từ/tới dummy cho các hoạt động không có hoạt động trước/sau thực (ước lượng trước để tính nc)
+    dummy_arcs = sum(predecessor_count[j] == 0 for j in range(1, N + 1)) + \
+        sum(not successors[i] for i in range(1, N + 1))
+    arcs = sum(len(successors[i]) for i in range(1, N + 1)) + dummy_arcs
+
+    # Thêm cung không thừa (xem redundant) tới khi đạt số cung trung bình nc
+    target = int(round(nc * (N + 2)))
+    attempts = 0
+    while arcs < target and attempts < 20 * target and N > 1:
+        attempts += 1
+        i = int(rng.integers(1, N))
+        j = int(rng.integers(i + 1, min(N, i + window) + 1))
+        if redundant(i, j):
+            continue
+        # Cung mới có thể thay cho cung dummy của i hoặc j
+        arcs += 1 - (not successors[i]) - (predecessor_count[j] == 0)
+        add_arc(i, j)
+
+    for j in range(1, N + 1):
+        if predecessor_count[j] == 0:
+            add_arc(0, j)
+        if not successors[j]:
+            add_arc(j, N + 1)
+    if not successors[0]:
+        add_arc(0, N + 1)
+
+    p = [0] + [int(v) for v in rng.integers(1, max_duration + 1, N)] + [0]
+    used = rng.random((N, K)) < rf
+    used[np.arange(N), rng.integers(0, K, N)] |= ~used.any(axis=1)  # Mỗi hoạt động dùng ít nhất một tài nguyên
+    demand = np.where(used, rng.integers(1, max_demand + 1, (N, K)), 0)
+    r = [[0] * K] + demand.tolist() + [[0] * K]
+
+    # Đỉnh sử dụng tài nguyên của lịch bắt đầu sớm nhất (thứ tự chỉ số là thứ tự tô-pô)
+    E = [0] * (N + 2)
+    for j in range(N + 2):
+        E[j] = max((E[i] + p[i] for i in predecessors[j]), default=0)
+    profile = np.zeros((max(E[j] + p[j] for j in range(N + 2)) + 1, K), dtype=int)
+    for j in range(1, N + 1):
+        profile[E[j]:E[j] + p[j]] += r[j]
+    rmin = demand.max(axis=0)
+    rmax = profile.max(axis=0)
+    R = [int(v) for v in rmin + np.round(rs * (rmax - rmin))]
+
+    T = int(_serial_makespan(p, r, R, predecessors) * (1 + slack))
+    name = name if name is not None else f"gen_n{N}_k{K}_s{seed}"
+    return make_instance(name, p, R, r, successors, T=T)
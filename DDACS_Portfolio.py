@@ -0,0 +1,140 @@
+"""
+Giải đồng thời nhiều dự án bằng DDACS trên một nhóm tiến trình
+
+Author: Phạm Lê Ngọc Sơn
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+from DDACS_Benchmark import make_solver
+
+def _solve_bundle(bundle, params, options):
+    """Giải tuần tự một gói bài toán trong một tiến trình, trả về danh sách kết quả"""
+    results = []
+    for index, instance, seed, time_budget in bundle:
+        start = time.perf_counter()
+        solver = make_solver(instance, seed, params, **options)
+        solution, makespan = solver.run(time_budget=time_budget)
+        results.append({
+            "index": index,
+            "instance": instance["name"],
+            "N": instance["N"],
+            "solution": solution,
+            "makespan": makespan,
+            "lower_bound": solver.lower_bound,
+            "iterations": solver.iteration,
+            "stop_reason": solver.stop_reason,
+            "wall_time": time.perf_counter() - start,
+            "pid": os.getpid(),
+        })
+    return results
+
+# Bộ giải danh mục: phân phối một dòng bài toán lên nhóm tiến trình
+class PortfolioSolver:
+    def __init__(self, params=None, time_budget=None, n_jobs=None, bundle_size=200, max_pending=None, seed=0,
+                 **options):
+        self.params = params  # Ghi đè DEFAULT_PARAMS của DDACS_Benchmark
+        # Ngân sách thời gian (giây) cho mỗi bài toán: số, hàm nhận bài toán, hoặc khóa "time_budget" của bài toán
+        self.time_budget = time_budget
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        # Các bài toán nhỏ được gói lại tới khi tổng số hoạt động đạt bundle_size,
+        # để chi phí gửi/nhận giữa các tiến trình không lấn át thời gian giải
+        self.bundle_size = bundle_size
+        # Số gói tối đa đang chờ trong nhóm tiến trình (dòng bài toán chỉ được đọc khi cần)
+        self.max_pending = max_pending or 2 * self.n_jobs
+        self.seed = seed
+        self.options = options  # Tham số chuyển thẳng cho DDACS (event_driven, improve, ...)
+        self.metrics = {}
+
+    def budget(self, instance):
+        """Ngân sách thời gian của một bài toán"""
+        if "time_budget" in instance:
+            return instance["time_budget"]
+        if callable(self.time_budget):
+            return self.time_budget(instance)
+        return self.time_budget
+
+    def instance_seed(self, index):
+        """Seed của bài toán thứ index, không phụ thuộc cách gói và số tiến trình"""
+        return int(np.random.SeedSequence([self.seed, index]).generate_state(1)[0])
+
+    def bundles(self, instances):
+        """Gói các bài toán liên tiếp của dòng: mỗi gói có tổng N + 2 tối thiểu bundle_size (trừ gói cuối)"""
+        bundle, size = [], 0
+        for index, instance in enumerate(instances):
+            bundle.append((index, instance, self.instance_seed(index), self.budget(instance)))
+            size += instance["N"] + 2
+            if size >= self.bundle_size:
+                yield bundle
+                bundle, size = [], 0
+        if bundle:
+            yield bundle
+
+    def solve(self, instances):
+        """
+        Giải mọi bài toán của dòng instances (list hoặc iterator các dict bài toán), trả về từng kết quả
+        (không theo thứ tự đầu vào; khóa "index" là vị trí đầu vào). Các kết quả của một gói được trả về
+        cùng lúc khi cả gói giải xong, không ngay sau từng bài toán.
+        Thống kê chung được cập nhật trong self.metrics sau mỗi gói; bài toán không có lời giải
+        (makespan vô hạn) được đếm trong "infeasible" và không tính vào "mean_gap".
+        """
+        start = time.perf_counter()
+        self.metrics = {"instances": 0, "activities": 0, "bundles": 0, "solve_time": 0.0, "wall_time": 0.0,
+                        "instances_per_second": 0.0, "activities_per_second": 0.0, "utilization": 0.0,
+                        "mean_gap": 0.0, "infeasible": 0}
+        gaps = []
+
+        def record(results):
+            for row in results:
+                self.metrics["instances"] += 1
+                self.metrics["activities"] += row["N"]
+                self.metrics["solve_time"] += row["wall_time"]
+                if not math.isfinite(row["makespan"]):
+                    self.metrics["infeasible"] += 1
+                elif row["lower_bound"] > 0:
+                    gaps.append((row["makespan"] - row["lower_bound"]) / row["lower_bound"])
+            self.metrics["bundles"] += 1
+            wall_time = time.perf_counter() - start
+            self.metrics["wall_time"] = wall_time
+            if wall_time > 0:
+                self.metrics["instances_per_second"] = self.metrics["instances"] / wall_time
+                self.metrics["activities_per_second"] = self.metrics["activities"] / wall_time
+                self.metrics["utilization"] = self.metrics["solve_time"] / (wall_time * self.n_jobs)
+            self.metrics["mean_gap"] = sum(gaps) / len(gaps) if gaps else 0.0
+            return results
+
+        bundles = self.bundles(instances)
+        if self.n_jobs == 1:
+            for bundle in bundles:
+                yield from record(_solve_bundle(bundle, self.params, self.options))
+            return
+
+        with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+            pending = set()
+            exhausted = False
+            try:
+                while pending or not exhausted:
+                    while not exhausted and len(pending) < self.max_pending:
+                        bundle = next(bundles, None)
+                        if bundle is None:
+                            exhausted = True
+                        else:
+                            pending.add(executor.submit(_solve_bundle, bundle, self.params, self.options))
+                    if not pending:
+                        break
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from record(future.result())
+            finally:
+                # Người dùng dừng đọc kết quả giữa chừng: bỏ các gói chưa bắt đầu
+                for future in pending:
+                    future.cancel()
+
+    def solve_all(self, instances):
+        """Giải mọi bài toán, trả về danh sách kết quả theo thứ tự đầu vào"""
+        return sorted(self.solve(instances), key=lambda row: row["index"])
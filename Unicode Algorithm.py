@@ -32,13 +32,15 @@ Original file is located at
 import time
 import re
 import json
+import heapq
 import unicodedata
+from collections import OrderedDict
 import numpy as np
 
 # NOTE: you MUST change this cell
 # New methods / functions must be written under class Solution.
 class Solution:
-    def __init__(self):
+    def __init__(self, lazy_shards: bool = False, max_shards: int = 8):
         # list provice, district, ward for private test, do not change for any reason (these file will be provided later with this exact name)
         self.province_path = 'list_province.txt'
         self.district_path = 'list_district.txt'
@@ -227,19 +229,47 @@ class Solution:
         self.province_node = self.Node()
         self.provinces = self._build_trie(self.province_list, self.province_standard_list, self.province_node, level=1)
 
+        # Với lazy_shards, trie và chỉ mục district/ward được tách theo province
+        # và chỉ xây dựng khi cần (xem get_shard), giữ tối đa max_shards shard trong bộ nhớ.
+        self.lazy_shards = lazy_shards
+        self.max_shards = max_shards
+        self.shards = OrderedDict()
+        self.shard = None
+        self.shard_stats = {"hits": 0, "builds": 0, "evictions": 0}
+
         self.districts = list()
         self.district_list = self.load_data(self.district_path, self.GROUPS_DISTRICT)
         # self.district_list = self.load_data_standard(self.district_path)
         self.district_standard_list = self.load_data_standard(self.district_standard_path)
-        self.district_node = self.Node()
-        self.districts = self._build_trie(self.district_list, self.district_standard_list, self.district_node, level=2)
+        self.district_node = None if lazy_shards else self.Node()
 
         self.wards = list()
         self.ward_list = self.load_data(self.ward_path, self.GROUPS_WARD)
         # self.ward_list = self.load_data_standard(self.ward_path)
         self.ward_standard_list = self.load_data_standard(self.ward_standard_path)
-        self.ward_node = self.Node()
-        self.wards = self._build_trie(self.ward_list, self.ward_standard_list, self.ward_node, level=3)
+        self.ward_node = None if lazy_shards else self.Node()
+
+        if lazy_shards:
+            self.districts = self._merge_data_lists(self.district_list, self.district_standard_list, level=2)
+            self.wards = self._merge_data_lists(self.ward_list, self.ward_standard_list, level=3)
+            self.district_shard_lines = self._group_by_province(self.districts, level=2)
+            self.ward_shard_lines = self._group_by_province(self.wards, level=3)
+            self.suffix_index = {1: self._build_suffix_index(self.provinces, level=1)}
+            self.hierarchy_node = self._build_hierarchy_index(self.provinces, [], [])
+        else:
+            self.districts = self._build_trie(self.district_list, self.district_standard_list, self.district_node,
+                                              level=2)
+            self.wards = self._build_trie(self.ward_list, self.ward_standard_list, self.ward_node, level=3)
+
+            # Chỉ mục hậu tố cho search_minimum_edit_distance
+            self.suffix_index = {
+                1: self._build_suffix_index(self.provinces, level=1),
+                2: self._build_suffix_index(self.districts, level=2),
+                3: self._build_suffix_index(self.wards, level=3),
+            }
+
+            # Trie hợp nhất province/district/ward cho match_hierarchy
+            self.hierarchy_node = self._build_hierarchy_index(self.provinces, self.districts, self.wards)
 
         # Các biến trạng thái xử lý địa chỉ
         self.address = ""
@@ -252,6 +282,13 @@ class Solution:
         self.word_count = 0
         self.has_districts = True
 
+        # Ngân sách thời gian cho mỗi lần gọi process (xem process(deadline_ms=...))
+        self.deadline = None
+        self.budget_exhausted = False
+        self.exhausted_levels = set()
+        # Số lần mỗi cấp bị dừng phần tìm kiếm mờ do hết thời gian
+        self.deadline_hits = {1: 0, 2: 0, 3: 0}
+
     # -------------------------------------------------------------------------
     # Lớp Node cho Trie
     class Node:
@@ -263,6 +300,27 @@ class Solution:
             self.children = {}  # Các node con, key là chữ thường của từ
             self.level = 0  # Mức độ của node trong trie
             self.is_terminal = False  # Đánh dấu kết thúc một từ
+            self.entries = list()  # (level, province, district, ward) kết thúc tại node (trie hợp nhất)
+
+    # -------------------------------------------------------------------------
+    # Chỉ mục hậu tố theo số từ cho tìm kiếm mờ theo cửa sổ
+    class SuffixIndex:
+        def __init__(self, datas: list):
+            self.datas = datas  # Danh sách gốc đã dùng để xây dựng chỉ mục
+            self.suffixes = {}  # data -> các hậu tố chữ thường, suffixes[k - 1] gồm k từ cuối của tên
+            self.buckets = {}  # phạm vi -> {số từ k: {hậu tố: [(thứ tự, data), ...]}}
+
+    # -------------------------------------------------------------------------
+    # Shard district/ward của một province (province None: toàn quốc)
+    class Shard:
+        def __init__(self, province):
+            self.province = province
+            self.districts = list()  # Danh sách district thuộc province
+            self.district_node = None  # Trie district
+            self.wards = list()  # Danh sách ward thuộc province
+            self.ward_node = None  # Trie ward
+            self.suffix_index = {}  # Chỉ mục hậu tố cấp 2 và 3
+            self.hierarchy_node = None  # Trie hợp nhất district/ward cho match_hierarchy
 
     # -------------------------------------------------------------------------
     def normalize_text(self, text: str) -> str:
@@ -307,6 +365,23 @@ class Solution:
         self.finish = False
         self.word_count = 0
         self.has_districts = True
+        self.deadline = None
+        self.budget_exhausted = False
+        self.exhausted_levels = set()
+        self.shard = None
+
+    def deadline_exceeded(self, level: int) -> bool:
+        """
+        Kiểm tra ngân sách thời gian của lần gọi process hiện tại.
+        Ghi nhận cấp (1: province, 2: district, 3: ward) bị dừng do hết thời gian.
+        """
+        if self.deadline is None or time.perf_counter() < self.deadline:
+            return False
+        self.budget_exhausted = True
+        if level not in self.exhausted_levels:
+            self.exhausted_levels.add(level)
+            self.deadline_hits[level] += 1
+        return True
 
     # -------------------------------------------------------------------------
     def insert_node(self, node: Node, data: str, level: int, province=None, district=None, ward=None) -> None:
@@ -330,64 +405,193 @@ class Solution:
             node.wards.append(ward)
         node.is_terminal = True
 
-    def _build_trie(self, data_list: list, data_standard_list: list, data_node: Node, level: int):
+    def _merge_data_lists(self, data_list: list, data_standard_list: list, level: int) -> list:
         """
-        Xây dựng trie từ data_list và data_standard_list.
+        Ghép data_list với data_standard_list.
         Nếu data_list chứa nhiều hoặc ít phần tử hơn data_standard_list, cập nhật data_standard_list.
         """
         datas = list()
         if len(data_list) >= len(data_standard_list):
+            if level == 1:
+                known = set(data_standard_list)
+            else:
+                known = {ds for data_standard in data_standard_list for ds in data_standard.split(' , ')}
             for data in data_list:
-                if level == 1:
-                    if data not in data_standard_list:
-                        data_standard_list.append(data)
-                else:
-                    exists = any(
-                        data == ds for data_standard in data_standard_list
-                        for ds in data_standard.split(' , ')
-                    )
-                    if not exists:
-                        data_standard_list.append(data)
+                if data not in known:
+                    data_standard_list.append(data)
+                    known.add(data)
             datas = data_standard_list
         else:
+            first_standard = dict()
+            if level != 1:
+                for data_standard in data_standard_list:
+                    first_standard.setdefault(data_standard.split(' , ')[0], data_standard)
             for data in data_list:
-                if level == 1:
-                    datas.append(data)
-                else:
-                    exists = False
-                    for data_standard in data_standard_list:
-                        ds = data_standard.split(' , ')[0]
-                        if data == ds:
-                            exists = True
-                            datas.append(data_standard)
-                            break
-                    if not exists:
-                        datas.append(data)
+                datas.append(first_standard.get(data, data))
+        return datas
 
+    def _group_by_province(self, datas: list, level: int) -> dict:
+        """
+        Nhóm các dòng district (level 2) hoặc ward (level 3) theo province.
+        Dòng không có province được đưa vào mọi nhóm (giữ thứ tự của datas), giống như chỉ mục
+        đầy đủ luôn tìm thấy chúng; chúng cũng nằm riêng ở khóa None.
+        """
+        groups = dict()
+        unassigned = []
+        for index, line in enumerate(datas):
+            parts = line.split(' , ')
+            if len(parts) > level - 1:
+                groups.setdefault(parts[level - 1], []).append((index, line))
+            else:
+                unassigned.append((index, line))
+        merged = {province: [line for _, line in heapq.merge(lines, unassigned)]
+                  for province, lines in groups.items()}
+        merged[None] = [line for _, line in unassigned]
+        return merged
+
+    def _insert_datas(self, datas: list, data_list: list, data_node: Node, level: int) -> None:
+        """Chèn các dòng của datas có tên nằm trong data_list vào trie."""
+        data_names = set(data_list)
         if level == 1:
             for line in datas:
                 parts = line.split(' , ')
-                if parts[0] in data_list:
+                if parts[0] in data_names:
                     self.insert_node(data_node, parts[0], level, province=parts[0])
 
         elif level == 2:
             for line in datas:
                 parts = line.split(' , ')
-                if parts[0] in data_list:
+                if parts[0] in data_names:
                     self.insert_node(data_node, parts[0], level,
                                      province=(None if len(parts) == 1 else parts[1]),
                                      district=parts[0])
         elif level == 3:
             for line in datas:
                 parts = line.split(' , ')
-                if parts[0] in data_list:
+                if parts[0] in data_names:
                     self.insert_node(data_node, parts[0], level,
                                      province=(None if len(parts) == 1 else parts[2]),
                                      district=(None if len(parts) == 1 else parts[1]),
                                      ward=parts[0])
 
+    def _build_trie(self, data_list: list, data_standard_list: list, data_node: Node, level: int):
+        """
+        Xây dựng trie từ data_list và data_standard_list.
+        Nếu data_list chứa nhiều hoặc ít phần tử hơn data_standard_list, cập nhật data_standard_list.
+        """
+        datas = self._merge_data_lists(data_list, data_standard_list, level)
+        self._insert_datas(datas, data_list, data_node, level)
         return datas
 
+    def get_shard(self, province) -> Shard:
+        """
+        Trả về shard district/ward của province, xây dựng khi dùng lần đầu.
+        Giữ tối đa max_shards shard, loại bỏ shard ít được dùng gần đây nhất.
+        """
+        shard = self.shards.get(province)
+        if shard is not None:
+            self.shards.move_to_end(province)
+            self.shard_stats["hits"] += 1
+            return shard
+
+        shard = self.Shard(province)
+        if province is None:
+            shard.districts = self.districts
+            shard.wards = self.wards
+        else:
+            # Province không có dòng riêng: vẫn tìm các dòng không có province
+            shard.districts = self.district_shard_lines.get(province, self.district_shard_lines[None])
+            shard.wards = self.ward_shard_lines.get(province, self.ward_shard_lines[None])
+        shard.district_node = self.Node()
+        self._insert_datas(shard.districts, self.district_list, shard.district_node, level=2)
+        shard.ward_node = self.Node()
+        self._insert_datas(shard.wards, self.ward_list, shard.ward_node, level=3)
+        shard.suffix_index = {
+            2: self._build_suffix_index(shard.districts, level=2),
+            3: self._build_suffix_index(shard.wards, level=3),
+        }
+        shard.hierarchy_node = self._build_hierarchy_index([], shard.districts, shard.wards)
+
+        self.shards[province] = shard
+        self.shard_stats["builds"] += 1
+        if len(self.shards) > self.max_shards:
+            self.shards.popitem(last=False)
+            self.shard_stats["evictions"] += 1
+        return shard
+
+    def _build_suffix_index(self, datas: list, level: int) -> SuffixIndex:
+        """
+        Xây dựng chỉ mục (phạm vi, số từ k, hậu tố k từ) -> các ứng viên.
+        Phạm vi là None (province), province (district) hoặc (province, district) (ward).
+        """
+        index = self.SuffixIndex(datas)
+        for order, data in enumerate(datas):
+            if level == 1:
+                scope, name = None, data
+            else:
+                data_split = data.split(",")
+                if len(data_split) < level:
+                    continue
+                name = data_split[0]
+                if level == 2:
+                    scope = data_split[1].strip()
+                else:
+                    scope = (data_split[2].strip(), data_split[1].strip())
+
+            suffixes = index.suffixes.get(data)
+            if suffixes is None:
+                arr = name.split()
+                suffixes = [" ".join(arr[len(arr) - k:]).lower() for k in range(1, len(arr) + 1)]
+                index.suffixes[data] = suffixes
+
+            buckets = index.buckets.setdefault(scope, {})
+            for k, suffix in enumerate(suffixes, start=1):
+                buckets.setdefault(k, {}).setdefault(suffix, []).append((order, data))
+        return index
+
+    def insert_hierarchy_node(self, node: Node, data: str, entry: tuple) -> None:
+        """Chèn tên vào trie hợp nhất theo thứ tự từ cuối đến đầu, gán entry ở node cuối."""
+        words = data.split()
+        for i in range(len(words) - 1, -1, -1):
+            word = words[i].strip()
+            word_lower = word.lower()
+            new_word = self.CORRECTED_VIETNAMESE_CHARS.get(word_lower)
+            word_lower = new_word if new_word else word_lower
+            if word_lower not in node.children:
+                new_node = self.Node()
+                new_node.word = word
+                node.children[word_lower] = new_node
+            node = node.children[word_lower]
+        node.is_terminal = True
+        node.entries.append(entry)
+
+    def _build_hierarchy_index(self, provinces: list, districts: list, wards: list) -> Node:
+        """
+        Xây dựng một trie chung cho cả ba cấp.
+        Mỗi tên kết thúc tại một node lưu (level, province, district, ward) của nó.
+        """
+        root = self.Node()
+        province_names = set(self.province_list)
+        district_names = set(self.district_list)
+        ward_names = set(self.ward_list)
+
+        for line in provinces:
+            parts = line.split(' , ')
+            if parts[0] in province_names:
+                self.insert_hierarchy_node(root, parts[0], (1, parts[0], None, None))
+        for line in districts:
+            parts = line.split(' , ')
+            if parts[0] in district_names:
+                province = None if len(parts) < 2 else parts[1]
+                self.insert_hierarchy_node(root, parts[0], (2, province, parts[0], None))
+        for line in wards:
+            parts = line.split(' , ')
+            if parts[0] in ward_names:
+                province = None if len(parts) < 3 else parts[2]
+                district = None if len(parts) < 3 else parts[1]
+                self.insert_hierarchy_node(root, parts[0], (3, province, district, parts[0]))
+        return root
+
     # -------------------------------------------------------------------------
     def kmp(self, pattern: str, text: str) -> bool:
         """
@@ -542,62 +746,70 @@ class Solution:
 
     def search_minimum_edit_distance(self, datas: list, address_arr: list, level: int, province: str = None,
                                      district: str = None):
-        if not address_arr:
+        if not address_arr or self.deadline_exceeded(level):
             return "", self.address_arr, self.address
 
-        index_data = 0
         results = list()
         words = ""
         end_loop = 0
         min_dis = 0
 
+        index = self.suffix_index.get(level)
+        if (index is None or index.datas is not datas) and self.shard is not None:
+            index = self.shard.suffix_index.get(level)
+        if index is None or index.datas is not datas:
+            index = self._build_suffix_index(datas, level)
+        if level == 1:
+            scope = None
+        elif level == 2:
+            scope = province
+        else:
+            scope = (province, district)
+        scope_buckets = index.buckets.get(scope, {})
+
         len_address_arr = len(address_arr)
         i = len_address_arr - 1
         while i >= end_loop and i >= 0:
             words = address_arr[i] + " " + words
             words_lower = words.lower().rstrip()
+            current_len_address_arr = len(words.split())
 
             minimum_distance = float('inf')
 
-            data_temp = list()
+            # Gom các ứng viên đủ dài theo hậu tố để mỗi hậu tố chỉ tính khoảng cách một lần
             if len(results) <= 0:
-                data_temp = datas
+                groups = scope_buckets.get(current_len_address_arr, {})
             else:
-                data_temp = results.copy()
-
-            for index, data in enumerate(data_temp):
-                arr = data.split()
-
-                if level == 2:
-                    data_split = data.split(",")
-                    if len(data_split) < 2 or data_split[1].strip() != province:
-                        continue
-                    arr = data_split[0].split()
-                elif level == 3:
-                    data_split = data.split(",")
-                    if len(data_split) < 3 or (data_split[2].strip() != province or data_split[1].strip() != district):
-                        continue
-                    arr = data_split[0].split()
-
-                len_arr = len(arr)
-                current_len_address_arr = len(words.split())
-                if len_arr >= current_len_address_arr:
-                    text = " ".join(arr[len_arr - current_len_address_arr:])
-                    text_lower = text.lower()
-
-                    distance = self.vietnamese_edit_distance(text_lower, words_lower)
-                    if distance < minimum_distance:
-                        results.clear()
-                        minimum_distance = distance
-                        index_data = index
-                        if len(results) == 0:
-                            results.append(data)
-                        else:
-                            results[0] = data
-                    elif distance == minimum_distance:
-                        minimum_distance = distance
-                        index_data = index
-                        results.append(data)
+                groups = dict()
+                for order, data in enumerate(results):
+                    suffixes = index.suffixes[data]
+                    if len(suffixes) >= current_len_address_arr:
+                        groups.setdefault(suffixes[current_len_address_arr - 1], []).append((order, data))
+
+            # Giữ lại kết quả của cửa sổ trước để trả về khi hết thời gian giữa chừng
+            prev_results, prev_min_dis = results.copy(), min_dis
+            timed_out = False
+            matched = list()
+            for text_lower, candidates in groups.items():
+                if self.deadline_exceeded(level):
+                    timed_out = True
+                    break
+                distance = self.vietnamese_edit_distance(text_lower, words_lower)
+                if distance < minimum_distance:
+                    minimum_distance = distance
+                    matched = list(candidates)
+                elif distance == minimum_distance:
+                    matched.extend(candidates)
+            if matched:
+                # Giữ thứ tự ban đầu của các ứng viên có cùng khoảng cách
+                results = [data for _, data in sorted(matched, key=lambda x: x[0])]
+
+            if timed_out:
+                # Hết thời gian: bỏ qua phần tìm kiếm mờ còn lại, dùng kết quả tốt nhất đã có
+                results, min_dis = prev_results, prev_min_dis
+                if len(results) == 0:
+                    return "", self.address_arr, self.address
+                break
 
             if len(results) == 0:
                 return "", self.address_arr, self.address
@@ -820,39 +1032,142 @@ class Solution:
         return ' '.join([self.CORRECTED_VIETNAMESE_CHARS.get(word, word) for word in words])
 
     # -------------------------------------------------------------------------
-    def process(self, s: str) -> dict:
+    def skip_noise(self, tokens: list, end: int) -> int:
+        """Bỏ qua các từ nhiễu (ký tự đơn lẻ, ký tự đặc biệt) ở cuối tokens[:end]."""
+        while end > 0:
+            word = tokens[end - 1]
+            if word in self.special or (
+                    len(word) == 1 and word not in self.VIETNAMESE_CHARS and not word.isnumeric()):
+                end -= 1
+                continue
+            break
+        return end
+
+    def match_exact(self, node: Node, tokens: list, end: int, level: int):
+        """
+        Tìm tên dài nhất thuộc cấp level kết thúc tại tokens[end - 1] trên trie hợp nhất node,
+        thỏa ràng buộc province/district đã tìm được. Entry không có province/district luôn được giữ,
+        như các shard (_group_by_province) đưa những dòng này vào mọi province.
+        Trả về (entry, vị trí bắt đầu) hoặc (None, end).
+        """
+        best, start = None, end
+        i = end - 1
+        while i >= 0:
+            node = node.children.get(tokens[i])
+            if node is None:
+                break
+            for entry in node.entries:
+                if entry[0] != level:
+                    continue
+                if level >= 2 and self.province and entry[1] and entry[1] != self.province:
+                    continue
+                if level == 3 and self.district and entry[2] and entry[2] != self.district:
+                    continue
+                best, start = entry, i
+                break
+            i -= 1
+        return best, start
+
+    def match_hierarchy(self, address_arr: list) -> None:
+        """
+        Duyệt mảng từ một lần từ phải sang trái: province -> district thuộc province
+        -> ward thuộc cả hai. Phần đã tiêu thụ được mang theo bằng chỉ số end,
+        chỉ dùng search_minimum_edit_distance khi không khớp chính xác.
+        """
+        tokens = [word.lower() for word in address_arr]
+        end = len(tokens)
+
+        levels = [1, 2, 3] if self.has_districts else [1, 3]
+        for level in levels:
+            end = self.skip_noise(tokens, end)
+            if end == 0:
+                break
+
+            if level == 1:
+                node, datas = self.hierarchy_node, self.provinces
+            elif self.lazy_shards:
+                if self.shard is None:
+                    self.shard = self.get_shard(self.province or None)
+                node = self.shard.hierarchy_node
+                datas = self.shard.districts if level == 2 else self.shard.wards
+            else:
+                node = self.hierarchy_node
+                datas = self.districts if level == 2 else self.wards
+
+            entry, start = self.match_exact(node, tokens, end, level)
+            if entry:
+                name = entry[level]
+            else:
+                name, remaining_arr, _ = self.search_minimum_edit_distance(datas, address_arr[:end], level,
+                                                                            province=self.province,
+                                                                            district=self.district)
+                start = len(remaining_arr) if name else end
+
+            if level == 1:
+                self.province = name
+            elif level == 2:
+                self.district = name
+            else:
+                self.ward = name
+            end = start
+
+        self.address_arr = address_arr[:end]
+        self.address = ' '.join(self.address_arr)
+
+    # -------------------------------------------------------------------------
+    def process(self, s: str, deadline_ms: float = None, unified: bool = False) -> dict:
         """
         Quy trình chính: chuẩn hóa địa chỉ, tách thành mảng từ,
         tìm kiếm province, district, ward theo thứ tự và trả về kết quả.
+        Nếu có deadline_ms, phần tìm kiếm mờ sẽ dừng khi hết thời gian và
+        kết quả có thêm cờ "budget_exhausted".
+        Nếu unified=True, dùng match_hierarchy (một lần duyệt) thay cho ba lần search_trie.
+        Với lazy_shards, district/ward chỉ được tìm trong shard của province đã tìm được.
         """
         self.init_process()
+        if deadline_ms is not None:
+            self.deadline = time.perf_counter() + deadline_ms / 1000
 
         self.address = self.normalize_text(self.preprocess(s)).rstrip()
         self.address_arr = self.address.split()
 
-        # Tìm kiếm theo thứ tự: province -> district -> ward
-        self.word_count = 0
-        self.province = self.search_trie(self.provinces, self.province_node, self.address_arr, 1, True)
-        self.finish = False
-        # Nếu quá trình cắt từ thay đổi độ dài mảng, cập nhật lại address_arr
-        base_arr = self.address.split()
-        self.address_arr = base_arr if len(base_arr) < len(self.address_arr) else self.address_arr
-
-        if self.has_districts:
+        if unified:
+            self.match_hierarchy(self.address_arr)
+            self.has_districts = True
+        else:
+            # Tìm kiếm theo thứ tự: province -> district -> ward
             self.word_count = 0
-            self.district = self.search_trie(self.districts, self.district_node, self.address_arr, 2, True)
+            self.province = self.search_trie(self.provinces, self.province_node, self.address_arr, 1, True)
             self.finish = False
+            # Nếu quá trình cắt từ thay đổi độ dài mảng, cập nhật lại address_arr
             base_arr = self.address.split()
             self.address_arr = base_arr if len(base_arr) < len(self.address_arr) else self.address_arr
-        self.has_districts = True
 
-        self.word_count = 0
-        self.ward = self.search_trie(self.wards, self.ward_node, self.address_arr, 3, True)
-        return {
+            districts, district_node = self.districts, self.district_node
+            wards, ward_node = self.wards, self.ward_node
+            if self.lazy_shards:
+                self.shard = self.get_shard(self.province or None)
+                districts, district_node = self.shard.districts, self.shard.district_node
+                wards, ward_node = self.shard.wards, self.shard.ward_node
+
+            if self.has_districts:
+                self.word_count = 0
+                self.district = self.search_trie(districts, district_node, self.address_arr, 2, True)
+                self.finish = False
+                base_arr = self.address.split()
+                self.address_arr = base_arr if len(base_arr) < len(self.address_arr) else self.address_arr
+            self.has_districts = True
+
+            self.word_count = 0
+            self.ward = self.search_trie(wards, ward_node, self.address_arr, 3, True)
+        result = {
             "province": self.province if self.province and self.province != "" else "",
             "district": self.district if self.district and self.district != "" else "",
             "ward": self.ward if self.ward and self.ward != "" else "",
         }
+        if deadline_ms is not None:
+            result["budget_exhausted"] = self.budget_exhausted
+        return result
 
 # NOTE: DO NOT change this cell
 # This cell is for downloading private test
@@ -0,0 +1,79 @@
+"""Chuỗi thay đổi ngẫu nhiên cho apply_changes, so với tính lại toàn bộ trên dự án mới"""
+import random
+
+import pytest
+
+from DDACS_Algorithm import calculate_E_L
+from DDACS_Benchmark import make_solver
+from DDACS_Instances import generate
+
+
+def random_events(solver, rng, count):
+    """Một chuỗi thay đổi ngẫu nhiên hợp lệ (không tạo chu trình) theo cách đánh số hiện tại"""
+    N, K = solver.N, len(solver.R)
+    events = []
+    for _ in range(count):
+        kind = rng.choice(["duration", "demand", "capacity", "precedence", "activity"])
+        if kind == "duration":
+            events.append({"type": kind, "activity": rng.randint(1, N), "value": rng.randint(1, 12)})
+        elif kind == "demand":
+            j = rng.randint(1, N)
+            events.append({"type": kind, "activity": j,
+                           "value": [rng.randint(0, solver.R[k]) for k in range(K)]})
+        elif kind == "capacity":
+            k = rng.randrange(K)
+            events.append({"type": kind, "resource": k,
+                           "value": max(solver.R[k], max(row[k] for row in solver.r))})
+        elif kind == "precedence":
+            # Cung theo thứ tự chỉ số ban đầu (i < j) luôn giữ đồ thị không chu trình
+            i, j = sorted(rng.sample(range(1, N + 1), 2))
+            events.append({"type": kind, "before": i, "after": j})
+        else:
+            i, j = sorted(rng.sample(range(1, N + 1), 2))
+            events.append({"type": kind, "duration": rng.randint(1, 10),
+                           "demand": [rng.randint(0, solver.R[k]) for k in range(K)],
+                           "predecessors": [i], "successors": [j]})
+            break  # Chỉ số của các sự kiện sau sẽ lệch khi hoạt động mới được chèn
+    return events
+
+
+@pytest.mark.parametrize("case", range(40))
+def test_random_change_sequences(case):
+    rng = random.Random(case)
+    instance = generate(rng.randint(6, 14), seed=case)
+    solver = make_solver(instance, seed=case, params={"ant": 4, "max_iter": 3}, event_driven=True,
+                         validate=True)
+    solver.run()
+
+    for _ in range(3):
+        solver.apply_changes(random_events(solver, rng, rng.randint(1, 4)))
+        N = solver.N
+        E, static_L = calculate_E_L(solver.predecessors, solver.successors, solver.p, N)
+        # E và L tĩnh tính tăng dần phải khớp với tính lại toàn bộ
+        assert solver.E[1:N + 1] == E[1:N + 1]
+        assert solver.static_L[:N + 1] == static_L[:N + 1]
+        # L đã điều chỉnh không nhỏ hơn giá trị tĩnh
+        assert all(solver.L[j] >= static_L[j] for j in range(N + 1))
+
+        # Lời giải đã sửa (nếu đã có lời giải khả thi) đầy đủ, khả thi và vừa trong T mới
+        if solver.best_solution is not None:
+            report = solver.validate_schedules(solver.best_solution, details=False)
+            assert report["complete"] and report["feasible"]
+            assert solver.best_makespan == report["makespan"] <= solver.T
+
+        solution, makespan = solver.run(resume=True)
+        if solution is not None:
+            report = solver.validate_schedules(solution, details=False)
+            assert report["complete"] and report["feasible"] and makespan == report["makespan"]
+
+
+def test_explicit_horizon_too_short():
+    instance = generate(10, seed=1)
+    solver = make_solver(instance, seed=1, params={"ant": 4, "max_iter": 3}, event_driven=True,
+                         validate=True)
+    solver.run()
+    T, best = solver.T, solver.best_solution
+    with pytest.raises(ValueError):
+        solver.apply_changes([{"type": "duration", "activity": 1, "value": solver.T}], T=solver.T)
+    # Trạng thái không đổi khi thay đổi bị từ chối
+    assert solver.T == T and solver.best_solution == best
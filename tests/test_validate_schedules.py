@@ -0,0 +1,73 @@
+"""validate_schedules so với một bộ kiểm tra trực tiếp theo định nghĩa, trên lời giải ngẫu nhiên"""
+import random
+
+import numpy as np
+
+from DDACS_Benchmark import make_solver
+from DDACS_Instances import generate
+
+
+def naive_check(solver, S):
+    """Kiểm tra từng cung và từng thời điểm, từng tài nguyên"""
+    n, p, r, R = solver.N + 2, solver.p, solver.r, solver.R
+    scheduled = [j for j in range(n) if S[j] != -1]
+    makespan = max((S[j] + p[j] for j in scheduled), default=0)
+    precedence = sorted((i, j) for j in scheduled for i in solver.predecessors[j]
+                        if S[i] == -1 or S[i] + p[i] > S[j])
+    resource = []
+    for t in range(max(solver.T, makespan) + 1):
+        for k in range(len(R)):
+            used = sum(r[j][k] for j in scheduled if S[j] <= t < S[j] + p[j])
+            if used > R[k]:
+                resource.append((t, k, used - R[k]))
+    return {
+        "makespan": makespan,
+        "complete": len(scheduled) == n,
+        "missing": [j for j in range(n) if S[j] == -1],
+        "precedence_violations": precedence,
+        "resource_violations": resource,
+        "feasible": len(scheduled) == n and not precedence and not resource,
+    }
+
+
+def random_schedule(solver, rng, kind):
+    """Lời giải của một kiến (theo sự kiện hoặc từng đơn vị thời gian) hoặc thời điểm bắt đầu ngẫu nhiên"""
+    if kind == 0:
+        solver.event_driven = True
+        S = solver.build_solution()
+    elif kind == 1:
+        solver.event_driven = False
+        S = solver.build_solution()
+    else:
+        S = [rng.randrange(solver.T) for _ in range(solver.N + 2)]
+    # Làm nhiễu: dời hoặc bỏ một số hoạt động
+    for j in rng.sample(range(solver.N + 2), rng.randint(0, 2)):
+        S[j] = -1 if rng.random() < 0.5 else max(0, S[j] + rng.randint(-3, 3))
+    return S
+
+
+def compare(report, expected):
+    assert report["makespan"] == expected["makespan"]
+    assert report["complete"] == expected["complete"]
+    assert report["feasible"] == expected["feasible"]
+    assert list(report["missing"]) == expected["missing"]
+    assert sorted(map(tuple, report["precedence_violations"].tolist())) == expected["precedence_violations"]
+    assert sorted(map(tuple, report["resource_violations"].tolist())) == expected["resource_violations"]
+    assert report["precedence"] == len(expected["precedence_violations"])
+    assert report["overload"] == len(expected["resource_violations"])
+
+
+def test_against_naive_checker():
+    rng = random.Random(0)
+    for case in range(500):
+        instance = generate(rng.randint(3, 12), K=rng.randint(1, 4), seed=case)
+        solver = make_solver(instance, seed=case, params={"ant": 1, "max_iter": 1})
+        schedules = [random_schedule(solver, rng, (case + offset) % 3) for offset in range(2)]
+        expected = [naive_check(solver, S) for S in schedules]
+        for S, reference in zip(schedules, expected):
+            compare(solver.validate_schedules(S), reference)
+
+        # Một lô cho cùng kết quả như từng lời giải
+        batch = solver.validate_schedules(np.array(schedules))
+        for b, reference in enumerate(expected):
+            compare({key: value[b] for key, value in batch.items()}, reference)